@@ -1,7 +1,16 @@
 import streamlit as st
 
+from src.config.config import ConfigManager
+from src.components.inference_server import InferenceClient
 from steps.model_inference_step import predict
 
+
+@st.cache_resource
+def get_inference_client():
+    server_url = ConfigManager().get_model_serving_config().server_url
+    return InferenceClient(server_url) if server_url else None
+
+
 st.title("Chest Cancer Classification")
 
 image = st.file_uploader(label="Upload chest CT-Scan image.", type=["jpg", "png"])
@@ -14,6 +23,7 @@ if get_prediction:
         st.image(image)
     with cols[1]:
         st.write("### Prediction")
-        prediction = predict(image)
+        client = get_inference_client()
+        prediction = client.predict(image) if client else predict(image)
         st.write("# ")
-        st.write(prediction)
\ No newline at end of file
+        st.write(prediction)
@@ -0,0 +1,177 @@
+import dataclasses
+import json
+import os
+import platform
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src import logger
+from src.config.config import ConfigManager
+
+
+def write_synthetic_images(directory: Path, n_images: int, size: list, seed: int = None) -> list:
+    """
+    Writes CT-like synthetic PNG images: a bright body ellipse
+    with darker lungs on a black background plus noise.
+
+    :param directory: directory to write to.
+    :param n_images: number of images.
+    :param size: (height, width) of the images.
+    :param seed: random seed.
+    :return: list of image paths.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    height, width = size
+    rows, cols = np.mgrid[:height, :width]
+    rows, cols = rows / height - 0.5, cols / width - 0.5
+    body = (rows / 0.4) ** 2 + (cols / 0.45) ** 2 < 1
+    lungs = ((rows / 0.3) ** 2 + ((np.abs(cols) - 0.2) / 0.15) ** 2) < 1
+
+    paths = []
+    for i in range(n_images):
+        pixels = np.where(body, 170, 0) - np.where(lungs, 120, 0) + rng.normal(0, 20, (height, width))
+        pixels = np.clip(pixels, 0, 255).astype("uint8")
+        path = Path(directory) / f"synthetic_{i:05d}.png"
+        Image.fromarray(pixels).convert("RGB").save(path)
+        paths.append(path)
+    return paths
+
+
+def write_synthetic_dataset(root_dir: Path, images_per_class: int, n_classes: int, size: list,
+                            seed: int = None) -> Path:
+    """
+    Writes a synthetic dataset in the train/valid/test/<class>
+    layout of the extracted data. Valid and test hold a quarter
+    of the train images per class.
+
+    :return: dataset directory.
+    """
+    dataset_dir = Path(root_dir) / "dataset"
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+    split_sizes = {"train": images_per_class, "valid": max(1, images_per_class // 4),
+                   "test": max(1, images_per_class // 4)}
+    for split_index, (split, n_images) in enumerate(split_sizes.items()):
+        for class_index in range(n_classes):
+            class_seed = None if seed is None else seed + split_index * n_classes + class_index
+            write_synthetic_images(dataset_dir / split / f"class_{class_index}", n_images=n_images,
+                                   size=size, seed=class_seed)
+    logger.info(f"Synthetic dataset written to {dataset_dir}.")
+    return dataset_dir
+
+
+def build_benchmark_model(config: ConfigManager, model_type: str, root_dir: Path) -> Path:
+    """
+    Builds the pipeline's model (backbone plus classification head)
+    with random weights, so benchmarks run offline.
+
+    :param config: ConfigManager of params.yaml.
+    :param model_type: ModelFactory architecture.
+    :param root_dir: directory the models are saved to.
+    :return: path to the saved model.
+    """
+    from src.components.base_model import BaseModel
+
+    model_dir = Path(root_dir) / model_type
+    base_model_config = dataclasses.replace(
+        config.get_basemodel_config(),
+        root_dir=model_dir,
+        base_model_path=model_dir / "base_model.keras",
+        updated_base_model_path=model_dir / "model.keras",
+        model_type=model_type,
+        weights=None
+    )
+    os.makedirs(model_dir, exist_ok=True)
+    base_model = BaseModel(config=base_model_config)
+    base_model.get_base_model()
+    base_model.update_base_model()
+    return base_model_config.updated_base_model_path
+
+
+def get_percentiles(values: list) -> dict:
+    """
+    :param values: measured durations in seconds.
+    :return: mean and p50/p95/p99 in milliseconds.
+    """
+    values = np.asarray(values) * 1000
+    return {
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99))
+    }
+
+
+def get_environment() -> dict:
+    """
+    Describes what the results were measured on.
+    """
+    import tensorflow as tf
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "tensorflow": tf.__version__,
+        "cpu_count": os.cpu_count()
+    }
+
+
+def write_results(root_dir: Path, name: str, results: dict) -> Path:
+    """
+    Writes results as <name>-<commit>-<timestamp>.json and
+    <name>-latest.json so runs can be compared across commits.
+
+    :return: path to the timestamped results file.
+    """
+    os.makedirs(root_dir, exist_ok=True)
+    environment = results["environment"]
+    stamp = environment["timestamp"].replace(":", "").replace("-", "")
+    path = Path(root_dir) / f"{name}-{environment['commit']}-{stamp}.json"
+    for target in (path, Path(root_dir) / f"{name}-latest.json"):
+        with open(target, "w") as f:
+            json.dump(results, f, indent=2)
+    logger.info(f"Benchmark results written to {path}.")
+    return path
+
+
+def compare_results(baseline_path: Path, results: dict, key_fields: list, metric_fields: list) -> list:
+    """
+    Matches the rows of two result files and logs the
+    relative change of each metric.
+
+    :param baseline_path: results file of an earlier run.
+    :param results: results of this run.
+    :param key_fields: fields identifying a row, e.g. model_type.
+    :param metric_fields: fields to compare.
+    :return: list of {key fields, metric, baseline, current, change} rows.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    baseline_rows = {tuple(row.get(key) for key in key_fields): row for row in baseline["results"]}
+
+    changes = []
+    for row in results["results"]:
+        baseline_row = baseline_rows.get(tuple(row.get(key) for key in key_fields))
+        if baseline_row is None:
+            continue
+        for metric in metric_fields:
+            if row.get(metric) is None or not baseline_row.get(metric):
+                continue
+            change = row[metric] / baseline_row[metric] - 1
+            changes.append({**{key: row.get(key) for key in key_fields}, "metric": metric,
+                            "baseline": baseline_row[metric], "current": row[metric], "change": change})
+            logger.info(f"{[row.get(key) for key in key_fields]} {metric}: "
+                        f"{baseline_row[metric]:.2f} -> {row[metric]:.2f} ({change:+.1%}).")
+    return changes
@@ -0,0 +1,168 @@
+import argparse
+import dataclasses
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src import logger
+from src.config.config import ConfigManager
+from src.config.config_manager import InferenceBenchmarkConfig
+from benchmarks.common import write_synthetic_images, build_benchmark_model, get_percentiles, \
+    get_environment, write_results, compare_results
+
+
+BENCHMARK_NAME = "inference"
+KEY_FIELDS = ["kind", "model_type", "backend", "threads", "batch_size"]
+METRIC_FIELDS = ["cold_start_s", "p50_ms", "p95_ms", "p99_ms", "model_images_per_s", "pipeline_images_per_s"]
+
+
+def run_inference_benchmark(model_type: str, model_path: Path, image_files: list, threads: int,
+                            backend: str, config: InferenceBenchmarkConfig) -> list:
+    """
+    Measures one architecture on one inference backend at one thread count. Runs in a freshly
+    spawned process, so the cold start includes importing TensorFlow
+    and the thread limits apply before TensorFlow starts.
+
+    :return: result rows (one latency row, one throughput row per batch size).
+    """
+    start = time.perf_counter()
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(2 if threads >= 4 else 1)
+    from src.components.model_predictor import ModelPredictor
+    from src.components.model_registry import ModelRegistry
+    import_s = time.perf_counter() - start
+
+    inference_config = dataclasses.replace(ConfigManager().get_model_inference_config(),
+                                           backend=backend, model_path=model_path, img_size=config.img_size,
+                                           reload_interval=0, decode_workers=threads)
+    registry = ModelRegistry(config=inference_config)
+
+    # The compiled backend loads and traces the model when the predictor is created.
+    start = time.perf_counter()
+    predictor = ModelPredictor(config=inference_config, registry=registry)
+    registry.get_model()
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    predictor.predict_arrays(predictor.load_image(image_files[0])[np.newaxis])
+    first_predict_s = time.perf_counter() - start
+
+    # Single image latency, same calls as steps.model_inference_step.predict.
+    end_to_end, model_only = [], []
+    for i in range(config.latency_runs):
+        start = time.perf_counter()
+        img = predictor.load_image(image_files[i % len(image_files)])
+        decoded = time.perf_counter()
+        predictor.predict_arrays(img[np.newaxis])
+        end = time.perf_counter()
+        end_to_end.append(end - start)
+        model_only.append(end - decoded)
+
+    rows = [{
+        "kind": "latency",
+        "model_type": model_type,
+        "backend": backend,
+        "threads": threads,
+        "batch_size": 1,
+        "import_s": import_s,
+        "load_s": load_s,
+        "first_predict_s": first_predict_s,
+        "cold_start_s": import_s + load_s + first_predict_s,
+        **get_percentiles(end_to_end),
+        "model": get_percentiles(model_only)
+    }]
+    logger.info(f"{model_type} on {backend} with {threads} threads: cold start {rows[0]['cold_start_s']:.2f}s, "
+                f"p50 {rows[0]['p50_ms']:.1f}ms, p99 {rows[0]['p99_ms']:.1f}ms.")
+
+    images = np.stack([predictor.load_image(image_file) for image_file in image_files])
+    for batch_size in config.batch_sizes:
+        batch = images[np.arange(batch_size) % len(images)]
+        n_batches = max(3, math.ceil(config.throughput_images / batch_size))
+        # First call traces the batch shape.
+        predictor.predict_arrays(batch)
+
+        start = time.perf_counter()
+        for _ in range(n_batches):
+            predictor.predict_arrays(batch)
+        model_images_per_s = n_batches * batch_size / (time.perf_counter() - start)
+
+        files = [image_files[i % len(image_files)] for i in range(n_batches * batch_size)]
+        start = time.perf_counter()
+        for _ in predictor.predict_stream(files, batch_size=batch_size):
+            pass
+        pipeline_images_per_s = len(files) / (time.perf_counter() - start)
+
+        rows.append({
+            "kind": "throughput",
+            "model_type": model_type,
+            "backend": backend,
+            "threads": threads,
+            "batch_size": batch_size,
+            "model_images_per_s": model_images_per_s,
+            "pipeline_images_per_s": pipeline_images_per_s
+        })
+        logger.info(f"{model_type} on {backend} with {threads} threads, batch {batch_size}: "
+                    f"{model_images_per_s:.1f} img/s model only, {pipeline_images_per_s:.1f} img/s with decoding.")
+    return rows
+
+
+def inference_benchmark(model_types: list = None, threads: list = None, batch_sizes: list = None,
+                        backends: list = None, baseline: Path = None) -> dict:
+    """
+    Benchmarks cold start, single image latency and batch throughput
+    of every architecture on synthetic images with random weights.
+
+    :param model_types: architectures, defaults to config.
+    :param threads: TensorFlow intra-op thread counts, defaults to config.
+    :param batch_sizes: throughput batch sizes, defaults to config.
+    :param backends: inference backends, defaults to config.
+    :param baseline: earlier results file to compare with.
+    :return: benchmark results.
+    """
+    config_manager = ConfigManager()
+    config = config_manager.get_inference_benchmark_config()
+    overrides = {"model_types": model_types, "threads": threads, "batch_sizes": batch_sizes, "backends": backends}
+    config = dataclasses.replace(config, **{k: v for k, v in overrides.items() if v is not None})
+
+    image_files = write_synthetic_images(config.root_dir / "images", n_images=config.n_images,
+                                         size=config.source_size, seed=config.seed)
+
+    rows = []
+    for model_type in config.model_types:
+        model_path = build_benchmark_model(config_manager, model_type=model_type,
+                                           root_dir=config.root_dir / "models")
+        for backend in config.backends:
+            for n_threads in config.threads:
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    rows += executor.submit(run_inference_benchmark, model_type, model_path,
+                                            image_files, n_threads, backend, config).result()
+
+    results = {
+        "environment": get_environment(),
+        "config": {"img_size": config.img_size, "source_size": config.source_size,
+                   "latency_runs": config.latency_runs, "throughput_images": config.throughput_images},
+        "results": rows
+    }
+    if baseline is not None:
+        results["comparison"] = compare_results(baseline, results, KEY_FIELDS, METRIC_FIELDS)
+    write_results(config.root_dir, BENCHMARK_NAME, results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark inference latency and throughput offline.")
+    parser.add_argument("--model-types", nargs="+", choices=["vgg16", "mobilenet", "resnet50"])
+    parser.add_argument("--threads", nargs="+", type=int, help="TensorFlow intra-op thread counts.")
+    parser.add_argument("--batch-sizes", nargs="+", type=int)
+    parser.add_argument("--backends", nargs="+", choices=["keras", "compiled"])
+    parser.add_argument("--baseline", type=Path, help="results file of an earlier run to compare with.")
+    args = parser.parse_args()
+
+    inference_benchmark(model_types=args.model_types, threads=args.threads,
+                        batch_sizes=args.batch_sizes, backends=args.backends, baseline=args.baseline)
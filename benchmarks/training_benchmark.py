@@ -0,0 +1,225 @@
+import argparse
+import dataclasses
+import math
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from src import logger
+from src.config.config import ConfigManager
+from src.config.config_manager import TrainingBenchmarkConfig, DataPreprocessingConfig
+from src.components.data_loader import DataLoaderFactory, iterate_batches
+from src.components.model_trainer import ModelTrainer
+from src.components.tfrecord_exporter import TFRecordExporter
+from benchmarks.common import write_synthetic_dataset, build_benchmark_model, get_environment, \
+    write_results, compare_results
+
+
+BENCHMARK_NAME = "training"
+KEY_FIELDS = ["kind", "model_type", "data_backend", "augmentation", "batch_size"]
+METRIC_FIELDS = ["images_per_s"]
+
+
+class StepTimer(tf.keras.callbacks.Callback):
+    """
+    Records the duration of every training step, input fetch included.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.durations = []
+        self._start = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.durations.append(time.perf_counter() - self._start)
+
+    def get_images_per_s(self, batch_size: int, warmup_steps: int) -> float:
+        durations = self.durations[warmup_steps:] or self.durations
+        return batch_size * len(durations) / sum(durations)
+
+
+def prepare_backend_data(config_manager: ConfigManager, config: TrainingBenchmarkConfig, dataset_dir: Path):
+    """
+    Builds the artifacts the tfrecord and zip backends read from.
+    """
+    if "tfrecord" in config.data_backends:
+        export_config = dataclasses.replace(config_manager.get_tfrecord_export_config(),
+                                            root_dir=config.root_dir / "tfrecords", training_data=dataset_dir)
+        TFRecordExporter(config=export_config).export()
+    if "zip" in config.data_backends:
+        shutil.make_archive(str(config.root_dir / "dataset"), "zip", root_dir=dataset_dir.parent,
+                            base_dir=dataset_dir.name)
+
+
+def get_preprocessing_config(config_manager: ConfigManager, config: TrainingBenchmarkConfig, dataset_dir: Path,
+                             data_backend: str, batch_size: int, augmentation: bool) -> DataPreprocessingConfig:
+    return dataclasses.replace(
+        config_manager.get_data_preprocessing_config(),
+        training_data=dataset_dir,
+        batch_size=batch_size,
+        is_augmentation=augmentation,
+        img_size=config.img_size,
+        data_backend=data_backend,
+        image_cache_dir=config.root_dir / "image_cache",
+        tfrecord_dir=config.root_dir / "tfrecords",
+        source_zip=config.root_dir / "dataset.zip",
+        zip_index_dir=config.root_dir / "zip_index"
+    )
+
+
+def measure_input(preprocessing_config: DataPreprocessingConfig, config: TrainingBenchmarkConfig) -> float:
+    """
+    Iterates the training batches of a backend without a model.
+
+    :return: images per second the input pipeline delivers.
+    """
+    data_loader = DataLoaderFactory.get_data_loader(preprocessing_config)
+    data = data_loader.load("train", shuffle=True, augment=preprocessing_config.is_augmentation)
+
+    n_batches, n_images, start = 0, 0, time.perf_counter()
+    while n_batches < config.warmup_steps + config.n_steps:
+        for images, _ in iterate_batches(data):
+            n_batches += 1
+            if n_batches == config.warmup_steps:
+                start = time.perf_counter()
+            elif n_batches > config.warmup_steps:
+                n_images += len(images)
+            if n_batches == config.warmup_steps + config.n_steps:
+                break
+    return n_images / (time.perf_counter() - start)
+
+
+def measure_compute(model_path: Path, config: TrainingBenchmarkConfig, batch_size: int) -> float:
+    """
+    Fits the model on one batch held in memory, so no step waits for input.
+
+    :return: images per second the model trains on.
+    """
+    model = tf.keras.models.load_model(model_path)
+    rng = np.random.default_rng(config.seed)
+    images = rng.integers(0, 256, (batch_size, *config.img_size), dtype="uint8")
+    labels = tf.keras.utils.to_categorical(rng.integers(0, config.classes, batch_size), config.classes)
+    dataset = tf.data.Dataset.from_tensors((images, labels)).repeat()
+
+    timer = StepTimer()
+    model.fit(dataset, epochs=1, steps_per_epoch=config.warmup_steps + config.n_steps,
+              callbacks=[timer], verbose=0)
+    return timer.get_images_per_s(batch_size, config.warmup_steps)
+
+
+def measure_end_to_end(model_path: Path, preprocessing_config: DataPreprocessingConfig,
+                       config: TrainingBenchmarkConfig, root_dir: Path) -> float:
+    """
+    Trains through ModelTrainer.train on the synthetic dataset.
+
+    :return: images per second of training steps, validation excluded.
+    """
+    training_config = dataclasses.replace(
+        ConfigManager().get_model_training_config(),
+        root_dir=root_dir,
+        trained_model_path=root_dir / "model.keras",
+        base_model_path=model_path,
+        training_data=preprocessing_config.training_data,
+        batch_size=preprocessing_config.batch_size,
+        is_augmentation=preprocessing_config.is_augmentation,
+        img_size=preprocessing_config.img_size
+    )
+    model_trainer = ModelTrainer(train_config=training_config, preprocessing_config=preprocessing_config)
+    model_trainer.load_model(model_path)
+    model_trainer.preprocess_data()
+
+    epochs = max(1, math.ceil((config.warmup_steps + config.n_steps) / len(model_trainer.train_generator)))
+    timer = StepTimer()
+    model_trainer.train(epochs=epochs, callbacks=[timer])
+    return timer.get_images_per_s(preprocessing_config.batch_size, config.warmup_steps)
+
+
+def training_benchmark(model_types: list = None, data_backends: list = None, batch_sizes: list = None,
+                       baseline: Path = None) -> dict:
+    """
+    Measures input-only, compute-only and end-to-end training
+    throughput on a synthetic dataset, and tells for every
+    configuration whether input or compute limits training.
+
+    :param model_types: architectures, defaults to config.
+    :param data_backends: input pipeline backends, defaults to config.
+    :param batch_sizes: batch sizes, defaults to config.
+    :param baseline: earlier results file to compare with.
+    :return: benchmark results.
+    """
+    config_manager = ConfigManager()
+    config = config_manager.get_training_benchmark_config()
+    overrides = {"model_types": model_types, "data_backends": data_backends, "batch_sizes": batch_sizes}
+    config = dataclasses.replace(config, **{k: v for k, v in overrides.items() if v is not None})
+
+    dataset_dir = write_synthetic_dataset(config.root_dir, images_per_class=config.images_per_class,
+                                          n_classes=config.classes, size=config.source_size, seed=config.seed)
+    prepare_backend_data(config_manager, config, dataset_dir)
+    model_paths = {model_type: build_benchmark_model(config_manager, model_type=model_type,
+                                                     root_dir=config.root_dir / "models")
+                   for model_type in config.model_types}
+
+    rows = []
+    for batch_size in config.batch_sizes:
+        input_rates = {}
+        for data_backend in config.data_backends:
+            for augmentation in config.augmentation:
+                preprocessing_config = get_preprocessing_config(config_manager, config, dataset_dir,
+                                                                data_backend, batch_size, augmentation)
+                images_per_s = measure_input(preprocessing_config, config)
+                input_rates[(data_backend, augmentation)] = images_per_s
+                rows.append({"kind": "input", "data_backend": data_backend, "augmentation": augmentation,
+                             "batch_size": batch_size, "images_per_s": images_per_s})
+                logger.info(f"Input {data_backend} (augmentation={augmentation}), batch {batch_size}: "
+                            f"{images_per_s:.1f} img/s.")
+
+        for model_type, model_path in model_paths.items():
+            compute_rate = measure_compute(model_path, config, batch_size)
+            rows.append({"kind": "compute", "model_type": model_type, "batch_size": batch_size,
+                         "images_per_s": compute_rate})
+            logger.info(f"Compute {model_type}, batch {batch_size}: {compute_rate:.1f} img/s.")
+
+            for (data_backend, augmentation), input_rate in input_rates.items():
+                preprocessing_config = get_preprocessing_config(config_manager, config, dataset_dir,
+                                                                data_backend, batch_size, augmentation)
+                images_per_s = measure_end_to_end(model_path, preprocessing_config, config,
+                                                  root_dir=config.root_dir / "training")
+                bound = "input" if input_rate < compute_rate else "compute"
+                rows.append({"kind": "end_to_end", "model_type": model_type, "data_backend": data_backend,
+                             "augmentation": augmentation, "batch_size": batch_size,
+                             "images_per_s": images_per_s, "input_images_per_s": input_rate,
+                             "compute_images_per_s": compute_rate, "bound": bound,
+                             "efficiency": images_per_s / min(input_rate, compute_rate)})
+                logger.info(f"{model_type} on {data_backend} (augmentation={augmentation}), batch {batch_size}: "
+                            f"{images_per_s:.1f} img/s, {bound}-bound.")
+
+    results = {
+        "environment": get_environment(),
+        "config": {"img_size": config.img_size, "source_size": config.source_size,
+                   "images_per_class": config.images_per_class, "n_steps": config.n_steps,
+                   "warmup_steps": config.warmup_steps},
+        "results": rows
+    }
+    if baseline is not None:
+        results["comparison"] = compare_results(baseline, results, KEY_FIELDS, METRIC_FIELDS)
+    write_results(config.root_dir, BENCHMARK_NAME, results)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark input pipeline and training throughput offline.")
+    parser.add_argument("--model-types", nargs="+", choices=["vgg16", "mobilenet", "resnet50"])
+    parser.add_argument("--data-backends", nargs="+",
+                        choices=["generator", "tf_data", "memmap", "tfrecord", "zip"])
+    parser.add_argument("--batch-sizes", nargs="+", type=int)
+    parser.add_argument("--baseline", type=Path, help="results file of an earlier run to compare with.")
+    args = parser.parse_args()
+
+    training_benchmark(model_types=args.model_types, data_backends=args.data_backends,
+                       batch_sizes=args.batch_sizes, baseline=args.baseline)
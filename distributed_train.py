@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import mlflow
+
+from src import logger
+from src.config.config import ConfigManager
+from src.components.distribution import get_strategy, is_chief
+from src.components.hyperparameter_sweep import get_thread_limits
+from src.components.profiler import get_profiler
+from src.components.step_cache import StepCache
+from steps import data_ingestion_step
+
+
+EXPERIMENT_NAME = "Chest Cancer Classification"
+
+
+def distributed_training_pipeline(intra_op_threads: int = None, inter_op_threads: int = None):
+    """
+    Runs one worker of a multi-worker training cluster defined by
+    TF_CONFIG or distributed_training in config.yaml. Every worker
+    runs this, the chief additionally logs the run to mlflow.
+
+    :param intra_op_threads: TensorFlow intra-op threads of this worker.
+    :param inter_op_threads: TensorFlow inter-op threads of this worker.
+    """
+    import tensorflow as tf
+
+    if intra_op_threads:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    if inter_op_threads:
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+    config_manager = ConfigManager()
+    # Collective ops must be set up before the step creates any variable.
+    strategy = get_strategy(config_manager.get_distributed_training_config())
+    from steps.distributed_training_step import distributed_training_step
+
+    if not is_chief(strategy):
+        distributed_training_step(config=config_manager, strategy=strategy)
+        return
+
+    mlflow.set_experiment(EXPERIMENT_NAME)
+    with mlflow.start_run(run_name=f"distributed-{config_manager.params['MODEL_TYPE']}"):
+        mlflow.set_tag("purpose", "multi-worker training")
+        mlflow.log_params(config_manager.params)
+        mlflow.log_param("n_replicas", strategy.num_replicas_in_sync)
+
+        distributed_training_step(config=config_manager, strategy=strategy)
+        get_profiler().log_to_mlflow()
+
+    logger.info(f"Distributed training completed.")
+
+
+def launch_local_workers(n_workers: int):
+    """
+    Starts a cluster of n_workers processes on this machine,
+    worker 0 being the chief, with the CPU cores split between them.
+
+    :param n_workers: number of worker processes.
+    """
+    config_manager = ConfigManager()
+    # Workers share the ingested data, ingest once up front.
+    StepCache().run(data_ingestion_step.data_ingestion_step,
+                    data_ingestion_step.get_step_inputs(config_manager),
+                    config=config_manager)
+
+    base_port = config_manager.get_distributed_training_config().base_port
+    workers = [f"localhost:{base_port + index}" for index in range(n_workers)]
+    intra_op_threads, inter_op_threads = get_thread_limits(n_workers)
+    logger.info(f"Starting {n_workers} local workers on {workers} with "
+                f"{intra_op_threads} intra-op / {inter_op_threads} inter-op threads each.")
+
+    processes = []
+    for index in range(n_workers):
+        env = dict(os.environ,
+                   TF_CONFIG=json.dumps({"cluster": {"worker": workers},
+                                         "task": {"type": "worker", "index": index}}),
+                   OMP_NUM_THREADS=str(intra_op_threads))
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__),
+             "--intra-op-threads", str(intra_op_threads), "--inter-op-threads", str(inter_op_threads)],
+            env=env
+        ))
+
+    failed = [index for index, process in enumerate(processes) if process.wait() != 0]
+    if failed:
+        raise RuntimeError(f"Workers {failed} failed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run multi-worker data-parallel training.")
+    parser.add_argument("--local-workers", type=int,
+                        help="start a cluster of this many worker processes on this machine.")
+    parser.add_argument("--intra-op-threads", type=int, help="TensorFlow intra-op threads of this worker.")
+    parser.add_argument("--inter-op-threads", type=int, help="TensorFlow inter-op threads of this worker.")
+    args = parser.parse_args()
+
+    if args.local_workers:
+        launch_local_workers(n_workers=args.local_workers)
+    else:
+        distributed_training_pipeline(intra_op_threads=args.intra_op_threads,
+                                      inter_op_threads=args.inter_op_threads)
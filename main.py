@@ -1,19 +1,26 @@
+import argparse
+import os
 from urllib.parse import urlparse
 
 import mlflow
 
 from src import logger
 from src.config.config import ConfigManager
-from steps.data_ingestion_step import data_ingestion_step
+from src.components.artifact_context import ArtifactContext
+from src.components.checkpoint_manager import CheckpointManager, get_checkpoint_key
+from src.components.profiler import get_profiler
+from src.components.step_cache import StepCache
+from steps import data_ingestion_step, model_preparation_step, model_training_step, tfrecord_export_step, \
+    tflite_export_step
 from steps.model_evaluation_step import model_evaluation_step
-from steps.model_preparation_step import model_initialization_step
-from steps.model_training_step import model_training_step
 
 
 
-def mlflow_pipeline():
+def mlflow_pipeline(force: list = None):
     """
     End to end mlflow pipeline for training a CNN classifier
+
+    :param force: steps to run even if their inputs are unchanged, an empty list forces all steps.
     """
 
     logger.info("Loading configuration.")
@@ -27,7 +34,19 @@ def mlflow_pipeline():
     # Set the experiment name
     mlflow.set_experiment("Chest Cancer Classification")
 
-    with mlflow.start_run(run_name="VGG16") as run:
+    # A training killed midway continues in its mlflow run from the latest checkpoint.
+    checkpoint_config = config_manager.get_checkpoint_config()
+    checkpoint = None
+    if checkpoint_config.enabled:
+        trained_model_path = config_manager.config["model_training"]["trained_model_path"]
+        checkpoint = CheckpointManager(
+            config=checkpoint_config, key=get_checkpoint_key(config_manager.params, trained_model_path)
+        ).get_resume_checkpoint(n_epochs=config_manager.params["EPOCHS"])
+    resume_run_id = checkpoint["run_id"] if checkpoint is not None else None
+    if resume_run_id is not None:
+        logger.info(f"Resuming mlflow run {resume_run_id} from epoch {checkpoint['epoch']}.")
+
+    with mlflow.start_run(run_id=resume_run_id, run_name=None if resume_run_id else "VGG16") as run:
         run_id = run.info.run_id
 
         mlflow.set_tag("model_type", "cnn")
@@ -45,24 +64,62 @@ def mlflow_pipeline():
 
         mlflow.log_params(config_manager.params)
 
+        # Live models and data pipelines are handed between steps, disk copies are written in background.
+        context = ArtifactContext()
+        step_cache = StepCache(force=force, context=context)
+
         # 1. Data Ingestion
-        data_ingestion_step(config=config_manager)
+        step_cache.run(data_ingestion_step.data_ingestion_step,
+                       data_ingestion_step.get_step_inputs(config_manager),
+                       config=config_manager)
+
+        # 1.1 Optional TFRecord Export Step
+        if config_manager.params["DATA_BACKEND"] == "tfrecord":
+            step_cache.run(tfrecord_export_step.tfrecord_export_step,
+                           tfrecord_export_step.get_step_inputs(config_manager),
+                           config=config_manager)
 
         # 2. Model Preparation step
-        model_initialization_step(config=config_manager)
+        step_cache.run(model_preparation_step.model_initialization_step,
+                       model_preparation_step.get_step_inputs(config_manager),
+                       config=config_manager, context=context)
 
         # 3. Model Training Step
-        model_training_step(config=config_manager)
+        step_cache.run(model_training_step.model_training_step,
+                       model_training_step.get_step_inputs(config_manager),
+                       config=config_manager, context=context)
 
         # 4. Model Evaluation Step
-        model_evaluation_step(config=config_manager)
+        model_evaluation_step(config=config_manager, context=context)
+
+        # 5. Quantized TFLite Export Step
+        if config_manager.config["tflite_export"]["quantizations"]:
+            step_cache.run(tflite_export_step.tflite_export_step,
+                           tflite_export_step.get_step_inputs(config_manager),
+                           config=config_manager, context=context)
+
+        # 6. Wait for background artifact writes
+        context.close()
+        # Saved model sizes, the files are complete once the writes landed.
+        for name, path in [("updated_base_model", config_manager.get_basemodel_config().updated_base_model_path),
+                           ("trained_model", config_manager.get_model_training_config().trained_model_path)]:
+            if os.path.exists(path):
+                mlflow.log_metric(f"{name}_size_mb", os.path.getsize(path) / 1024 ** 2)
+
+        # 7. Log step and hot-call profiles
+        get_profiler().log_to_mlflow()
 
         logger.info(f"Pipeline operations completed successfully.")
 
 
 
 if __name__ == "__main__":
-    mlflow_pipeline()
+    parser = argparse.ArgumentParser(description="Run the chest cancer classification pipeline.")
+    parser.add_argument("--force", nargs="*", default=None, metavar="STEP",
+                        help="re-run steps even if their inputs are unchanged (all steps if none given).")
+    args = parser.parse_args()
+
+    mlflow_pipeline(force=args.force)
 
 
 
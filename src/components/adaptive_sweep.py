@@ -0,0 +1,281 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import mlflow
+
+from src import logger
+from src.config.config import ConfigManager
+from src.config.config_manager import HyperparameterSweepConfig
+from src.components.hyperparameter_sweep import (HyperparameterSweep, generate_trials, get_thread_limits,
+                                                 init_trial_worker, prepare_trial_config)
+
+
+def get_data_fraction(epochs: int, config: HyperparameterSweepConfig) -> float:
+    """
+    Share of the training data a rung trains on, growing with its
+    epoch budget so that only the full budget sees all the data.
+
+    :param epochs: epoch budget of the rung.
+    :param config: sweep configuration.
+    :return: data fraction in (0, 1].
+    """
+    if epochs >= config.max_epochs:
+        return 1.0
+    return min(1.0, config.min_data_fraction * epochs / config.min_epochs)
+
+
+def run_rung_trial(trial_id: int, trial_params: dict, trial_dir: Path, parent_run_id: str,
+                   experiment_name: str, shared_data_backend: str, run_id: str,
+                   initial_epoch: int, epochs: int, data_fraction: float, evaluate: bool) -> dict:
+    """
+    Trains one trial up to the epoch budget of a rung, continuing
+    from the checkpoint of its previous rung. Executed inside a pool worker.
+
+    :param run_id: MLflow run of the trial to resume, None starts it.
+    :param initial_epoch: epochs already trained in earlier rungs.
+    :param epochs: epoch budget of the rung.
+    :param data_fraction: share of training batches used per epoch.
+    :param evaluate: evaluates the model on the test split after training.
+    :return: trial summary with the rung's validation metrics.
+    """
+    # Imported here so TensorFlow is first loaded after init_trial_worker set the thread limits.
+    from src.components.artifact_context import ArtifactContext
+    from src.components.model_trainer import ModelTrainer
+    from src.components.profiler import get_profiler
+    from steps.model_evaluation_step import model_evaluation_step
+    from steps.model_preparation_step import model_initialization_step
+
+    config = prepare_trial_config(trial_params=trial_params, trial_dir=trial_dir,
+                                  shared_data_backend=shared_data_backend)
+
+    mlflow.set_experiment(experiment_name)
+    if run_id is None:
+        run = mlflow.start_run(run_name=f"trial-{trial_id:03d}", parent_run_id=parent_run_id, nested=True)
+        mlflow.log_params(config.params)
+    else:
+        run = mlflow.start_run(run_id=run_id)
+
+    with run:
+        context = ArtifactContext()
+        model_trainer = ModelTrainer(train_config=config.get_model_training_config(),
+                                     preprocessing_config=config.get_data_preprocessing_config(),
+                                     feature_cache_config=config.get_feature_cache_config(),
+                                     context=context)
+        model_trainer.preprocess_data()
+        if initial_epoch == 0:
+            model_initialization_step(config=config, context=context)
+            model_trainer.get_base_model()
+        else:
+            model_trainer.load_model(config.get_model_training_config().trained_model_path)
+        history = model_trainer.train(epochs=epochs, initial_epoch=initial_epoch, data_fraction=data_fraction)
+
+        for epoch_index, epoch in enumerate(history.epoch):
+            mlflow.log_metrics({name: values[epoch_index] for name, values in history.history.items()}, step=epoch)
+        mlflow.log_metrics({"budget_epochs": epochs, "budget_data_fraction": data_fraction}, step=epochs)
+
+        scores = model_evaluation_step(config=config, context=context) if evaluate else None
+        # The checkpoint has to be on disk before the next rung loads it.
+        context.close()
+        get_profiler().log_to_mlflow(artifact_file=f"profile_{epochs:03d}_epochs.json")
+
+    return {
+        "trial": trial_id,
+        "run_id": run.info.run_id,
+        "params": trial_params,
+        "epochs": epochs,
+        "metrics": {name: values[-1] for name, values in history.history.items()},
+        "scores": scores
+    }
+
+
+class SuccessiveHalvingSweep(HyperparameterSweep):
+    """
+    Starts every configuration on a small epoch and data budget
+    and promotes only the best 1/eta to the next, eta times larger,
+    budget. Promoted trials continue from their checkpoint.
+    """
+
+    def __init__(self, config: HyperparameterSweepConfig):
+        super().__init__(config)
+        self.cost = 0.0
+        self.n_configs = 0
+
+
+    def get_rung_epochs(self, min_epochs: int) -> list:
+        """
+        Epoch budgets of the rungs of one bracket.
+
+        :param min_epochs: budget of the first rung.
+        :return: increasing epoch budgets ending at max_epochs.
+        """
+        rung_epochs = [min_epochs]
+        while rung_epochs[-1] < self.config.max_epochs:
+            rung_epochs.append(min(self.config.max_epochs, rung_epochs[-1] * self.config.eta))
+        return rung_epochs
+
+
+    def get_rung_metric(self, result: dict) -> float:
+        if result.get("metrics") is None:
+            return -math.inf
+        return result["metrics"].get(self.config.rung_metric, -math.inf)
+
+
+    def run_rung(self, executor: ProcessPoolExecutor, trials: list, epochs: int,
+                 parent_run_id: str, experiment_name: str) -> list:
+        """
+        Trains every trial of a rung up to its epoch budget.
+
+        :param trials: trial states {"trial", "params", "run_id", "epochs"}.
+        :return: updated trial states.
+        """
+        data_fraction = get_data_fraction(epochs, self.config)
+        evaluate = epochs >= self.config.max_epochs
+        logger.info(f"Rung of {len(trials)} trials at {epochs} epochs on {data_fraction:.0%} of the data started.")
+
+        futures = {
+            executor.submit(run_rung_trial, trial["trial"], trial["params"],
+                            self.config.root_dir / f"trial_{trial['trial']:03d}",
+                            parent_run_id, experiment_name, "memmap", trial.get("run_id"),
+                            trial.get("epochs", 0), epochs, data_fraction, evaluate): trial
+            for trial in trials
+        }
+        results = []
+        for future in as_completed(futures):
+            trial = futures[future]
+            try:
+                result = future.result()
+                self.cost += (epochs - trial.get("epochs", 0)) * data_fraction
+                logger.info(f"Trial {trial['trial']} reached {epochs} epochs with "
+                            f"{self.config.rung_metric}={self.get_rung_metric(result):.4f}.")
+            except Exception as e:
+                logger.info(f"Trial {trial['trial']} failed: {e}")
+                result = {**trial, "metrics": None, "scores": None, "error": str(e)}
+            results.append(result)
+        return sorted(results, key=lambda result: result["trial"])
+
+
+    def run_bracket(self, executor: ProcessPoolExecutor, trials: list, min_epochs: int,
+                    parent_run_id: str, experiment_name: str) -> list:
+        """
+        Runs successive halving over a set of configurations.
+
+        :param trials: list of {PARAM: value} dicts.
+        :param min_epochs: epoch budget of the first rung.
+        :return: final state of every trial.
+        """
+        first_trial = len(self.results)
+        active = [{"trial": first_trial + i, "params": params} for i, params in enumerate(trials)]
+        finished = {}
+        rung_epochs = self.get_rung_epochs(min_epochs)
+        for rung, epochs in enumerate(rung_epochs):
+            active = self.run_rung(executor=executor, trials=active, epochs=epochs,
+                                   parent_run_id=parent_run_id, experiment_name=experiment_name)
+            finished.update({trial["trial"]: trial for trial in active})
+            if rung == len(rung_epochs) - 1:
+                break
+            ranked = sorted((trial for trial in active if trial.get("metrics")),
+                            key=self.get_rung_metric, reverse=True)
+            active = ranked[:max(1, len(active) // self.config.eta)]
+            if not active:
+                break
+            logger.info(f"Promoted trials {[trial['trial'] for trial in active]} to {rung_epochs[rung + 1]} epochs.")
+        return [finished[trial_id] for trial_id in sorted(finished)]
+
+
+    def get_brackets(self) -> list:
+        """
+        :return: [(configurations, first rung epochs)] to run.
+        """
+        trials = generate_trials(space=self.config.space, search=self.config.search,
+                                 n_trials=self.config.n_trials, seed=self.config.seed)
+        return [(trials, self.config.min_epochs)]
+
+
+    def run(self, base_config: ConfigManager, experiment_name: str) -> list:
+        """
+        Runs every bracket, then logs a summary and the compute saved
+        compared with training every configuration for max_epochs.
+
+        :param base_config: ConfigManager of the unmodified params.yaml.
+        :param experiment_name: MLflow experiment of the parent run.
+        :return: list of trial summaries.
+        """
+        brackets = self.get_brackets()
+        all_trials = [trial for trials, _ in brackets for trial in trials]
+        self.n_configs = len(all_trials)
+        logger.info(f"{self.config.adaptive} sweep of {self.n_configs} configurations "
+                    f"in {len(brackets)} brackets over {sorted(self.config.space)} started.")
+
+        self.prepare_shared_data(trials=all_trials, base_config=base_config)
+
+        parent_run_id = mlflow.active_run().info.run_id
+        intra_op_threads, inter_op_threads = get_thread_limits(self.config.max_workers)
+
+        # One pool for all rungs, so workers keep TensorFlow loaded between rungs.
+        with ProcessPoolExecutor(max_workers=self.config.max_workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_trial_worker,
+                                 initargs=(intra_op_threads, inter_op_threads)) as executor:
+            for trials, min_epochs in brackets:
+                self.results += self.run_bracket(executor=executor, trials=trials, min_epochs=min_epochs,
+                                                 parent_run_id=parent_run_id, experiment_name=experiment_name)
+
+        full_cost = self.n_configs * self.config.max_epochs
+        compute_saved = 1 - self.cost / full_cost if full_cost else 0.0
+        logger.info(f"Trained {self.cost:.1f} epoch equivalents instead of {full_cost} "
+                    f"for a full sweep, {compute_saved:.0%} compute saved.")
+        mlflow.log_metrics({"epoch_equivalents": self.cost, "full_sweep_epoch_equivalents": full_cost,
+                            "compute_saved": compute_saved})
+        mlflow.log_dict({"trials": self.results}, "sweep_results.json")
+
+        best_trial = self.get_best_trial()
+        if best_trial is not None:
+            mlflow.log_metric(f"best_{self.config.metric}", best_trial["scores"][self.config.metric])
+            mlflow.set_tag("best_trial_run_id", best_trial["run_id"])
+            logger.info(f"Best trial {best_trial['trial']}: {best_trial['params']} {best_trial['scores']}.")
+
+        return self.results
+
+
+class HyperbandSweep(SuccessiveHalvingSweep):
+    """
+    Hedges the first rung budget of successive halving: runs
+    brackets from many configurations on a small budget to few
+    configurations on the full budget, each randomly sampled.
+    """
+
+    def get_brackets(self) -> list:
+        s_max = int(math.log(self.config.max_epochs / self.config.min_epochs, self.config.eta) + 1e-9)
+        brackets = []
+        for s in range(s_max, -1, -1):
+            n_configs = math.ceil((s_max + 1) / (s + 1) * self.config.eta ** s)
+            min_epochs = max(self.config.min_epochs, round(self.config.max_epochs / self.config.eta ** s))
+            seed = None if self.config.seed is None else self.config.seed + s
+            trials = generate_trials(space=self.config.space, search="random", n_trials=n_configs, seed=seed)
+            brackets.append((trials, min_epochs))
+        return brackets
+
+
+class HyperparameterSweepFactory:
+    """
+    Factory class to get the configured sweep strategy.
+    """
+
+    @staticmethod
+    def get_sweep(config: HyperparameterSweepConfig) -> HyperparameterSweep:
+        """
+        Factory method to select the sweep based on config.
+
+        :param config: hyperparameter sweep configuration.
+        :return: An instance of a HyperparameterSweep class.
+        """
+        if config.adaptive == "none":
+            return HyperparameterSweep(config)
+        elif config.adaptive == "successive_halving":
+            return SuccessiveHalvingSweep(config)
+        elif config.adaptive == "hyperband":
+            return HyperbandSweep(config)
+        else:
+            raise ValueError(f"Unsupported adaptive sweep: {config.adaptive}")
@@ -0,0 +1,128 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable
+
+from src import logger
+
+
+class ArtifactContext:
+    """
+    Hands live objects (models, data pipelines) between
+    pipeline steps running in one process, while their disk
+    copies are written by a background thread.
+    """
+
+    def __init__(self):
+        self._artifacts = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifact-writer")
+
+
+    def put(self, key: str, artifact, path: Path = None, save: Callable = None):
+        """
+        Stores a live artifact and optionally persists it in the background.
+
+        :param key: name other steps use to get the artifact.
+        :param artifact: live object.
+        :param path: location to persist the artifact to.
+        :param save: callable(path) writing the artifact, defaults to artifact.save.
+        """
+        with self._lock:
+            self._artifacts[key] = artifact
+            if path is None:
+                return
+            save = save or artifact.save
+            future = self._executor.submit(self._persist, save, Path(path))
+            self._pending[key] = (Path(path), future)
+
+
+    @staticmethod
+    def _persist(save: Callable, path: Path):
+        logger.info(f"Persisting artifact to {path} in background.")
+        # Write next to the target and rename, so readers never see a partial file.
+        partial_path = path.with_name(f".{path.stem}.partial{path.suffix}")
+        save(partial_path)
+        os.replace(partial_path, path)
+        logger.info(f"Artifact persisted to {path}.")
+
+
+    def get(self, key: str, default=None):
+        """
+        Returns a live artifact put by an earlier step.
+        """
+        with self._lock:
+            return self._artifacts.get(key, default)
+
+
+    def wait(self, key: str = None):
+        """
+        Blocks until the background write of an artifact
+        (or of every artifact) is finished. Call it before
+        mutating an artifact that is still being persisted.
+
+        :param key: artifact name, None waits for all writes.
+        """
+        with self._lock:
+            if key is None:
+                futures = [future for _, future in self._pending.values()]
+            else:
+                futures = [self._pending[key][1]] if key in self._pending else []
+        self._raise_errors(futures)
+
+
+    def get_persisted_paths(self) -> set:
+        """
+        Absolute paths the context has written or is still writing in background.
+        """
+        with self._lock:
+            return {os.path.abspath(path) for path, _ in self._pending.values()}
+
+
+    def on_persisted(self, paths: list, callback: Callable):
+        """
+        Calls back once the pending writes to the given paths all
+        succeeded, right away if there are none. A failed write
+        never calls back.
+
+        :param paths: artifact paths.
+        :param callback: callable without arguments, may run on the writer thread.
+        """
+        targets = {os.path.abspath(path) for path in paths}
+        with self._lock:
+            futures = [future for path, future in self._pending.values() if os.path.abspath(path) in targets]
+        if not futures:
+            callback()
+            return
+
+        remaining = [len(futures)]
+        remaining_lock = threading.Lock()
+
+        def on_done(future):
+            if future.cancelled() or future.exception() is not None:
+                return
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            callback()
+
+        for future in futures:
+            future.add_done_callback(on_done)
+
+
+    @staticmethod
+    def _raise_errors(futures: list):
+        wait(futures)
+        for future in futures:
+            future.result()
+
+
+    def close(self):
+        """
+        Waits for all background writes and stops the writer.
+        """
+        self.wait()
+        self._executor.shutdown(wait=True)
@@ -1,9 +1,57 @@
 from pathlib import Path
 import tensorflow as tf
 from src.config.config_manager import BaseModelConfig
+from src.components.artifact_context import ArtifactContext
+from src.components.distribution import get_scope, is_chief
 from src.components.model_builder import ModelFactory
+from src.components.model_head import FeatureReductionFactory
 from src.components.model_loss import ModelLossFactory
 from src.components.model_optimizer import ModelOptimizerFactory
+from src.components.profiler import profile
+
+
+# Name prefix of the classification layers added on top of the backbone.
+HEAD_LAYER_PREFIX = "head_"
+# Name prefix of the resizing and rescaling layers embedded in front of the backbone.
+PREPROCESSING_LAYER_PREFIX = "preprocess_"
+
+
+def get_model_stats(model: tf.keras.Model) -> dict:
+    """
+    :param model: keras Model.
+    :return: total, trainable and classification head parameter counts.
+    """
+    head_layers = [layer for layer in model.layers if layer.name.startswith(HEAD_LAYER_PREFIX)]
+    return {
+        "params": model.count_params(),
+        "trainable_params": sum(int(tf.size(weight)) for weight in model.trainable_weights),
+        "head_params": sum(layer.count_params() for layer in head_layers)
+    }
+
+
+def snapshot_model(model: tf.keras.Model) -> tf.keras.Model:
+    """
+    Copies a model's architecture, trainable flags, weights,
+    compile setup and optimizer state, so it can be saved in
+    background while later steps go on using the original.
+
+    :param model: keras Model.
+    :return: independent copy of the model.
+    """
+    snapshot = tf.keras.models.clone_model(model)
+    snapshot.set_weights(model.get_weights())
+    if model.compiled:
+        snapshot.compile(
+            optimizer=model.optimizer.__class__.from_config(model.optimizer.get_config()),
+            loss=model.loss,
+            metrics=["accuracy"]
+        )
+        if model.optimizer.built:
+            # Continued training from the saved file, e.g. the next sweep rung, keeps the optimizer state.
+            snapshot.optimizer.build(snapshot.trainable_variables)
+            for variable, value in zip(snapshot.optimizer.variables, model.optimizer.variables):
+                variable.assign(value)
+    return snapshot
 
 
 class BaseModel:
@@ -11,8 +59,16 @@ class BaseModel:
     Class to load and save base model
     """
 
-    def __init__(self, config: BaseModelConfig):
+    def __init__(self, config: BaseModelConfig, context: ArtifactContext = None,
+                 strategy: tf.distribute.Strategy = None):
+        """
+        :param config: base model configuration.
+        :param context: artifact context handing models to later steps.
+        :param strategy: distribution strategy the model variables are created under.
+        """
         self.config = config
+        self.context = context
+        self.strategy = strategy
         self.model = None
         self.updated_model = None
         self.classes = self.config.classes
@@ -26,14 +82,39 @@ class BaseModel:
 
 
     def get_base_model(self):
+        input_img_size = self.config.input_img_size
+        if self.config.resize_schedule:
+            # Progressive resizing trains the backbone at several resolutions.
+            input_img_size = [None, None, input_img_size[-1]]
         model_ins = ModelFactory.get_cnn_model(model_type=self.config.model_type)
-        self.model = model_ins.create_model(
-            include_top=self.config.include_top,
-            weights=self.config.weights,
-            input_img_size=self.config.input_img_size
-        )
-        self.save_model(path=self.config.base_model_path,
-                        model=self.model)
+        with get_scope(self.strategy):
+            self.model = model_ins.create_model(
+                include_top=self.config.include_top,
+                weights=self.config.weights,
+                input_img_size=input_img_size
+            )
+        self.persist_model(key="base_model",
+                           path=self.config.base_model_path,
+                           model=self.model)
+
+
+    def get_model_input(self) -> tuple:
+        """
+        Input of the prepared model and the backbone features on it.
+        With embedded preprocessing the model takes uint8 images of
+        any size and resizes and rescales them in-graph.
+
+        :return: (model input, backbone output).
+        """
+        if not self.config.embed_preprocessing:
+            return self.model.input, self.model.output
+
+        height, width = self.config.input_img_size[:2]
+        inputs = tf.keras.Input(shape=(None, None, 3), dtype="uint8", name="image")
+        x = tf.keras.layers.Rescaling(1. / 255, name=f"{PREPROCESSING_LAYER_PREFIX}rescale")(inputs)
+        x = tf.keras.layers.Resizing(height, width, interpolation="bilinear",
+                                     name=f"{PREPROCESSING_LAYER_PREFIX}resize")(x)
+        return inputs, self.model(x)
 
 
     def prepare_model(self, freeze_all: bool, freeze_till: int) -> tf.keras.Model:
@@ -46,6 +127,13 @@ class BaseModel:
         :param freeze_till: number of layers from the end to keep trainable.
         :return: compiled model with additional configuration.
         """
+        if self.config.resize_schedule and self.config.head_type == "flatten":
+            raise ValueError("RESIZE_SCHEDULE needs a HEAD_TYPE independent of the input size "
+                             "(avg_pooling or max_pooling).")
+        if self.config.resize_schedule and self.config.embed_preprocessing:
+            raise ValueError("RESIZE_SCHEDULE cannot be combined with EMBED_PREPROCESSING, "
+                             "the embedded resizing fixes the backbone input size.")
+
         if freeze_all:
             for layer in self.model.layers:
                 layer.trainable=False
@@ -53,22 +141,42 @@ class BaseModel:
             for layer in self.model.layers[:-freeze_till]:
                 layer.trainable=False
 
-        flatten_in = tf.keras.layers.Flatten()(self.model.output)
-        output = tf.keras.layers.Dense(
-            units=self.classes,
-            activation="softmax"
-        )(flatten_in)
+        with get_scope(self.strategy):
+            inputs, features = self.get_model_input()
+            x = FeatureReductionFactory.get_feature_reduction(
+                head_type=self.config.head_type
+            ).get_layer(name=f"{HEAD_LAYER_PREFIX}{self.config.head_type}")(features)
+            if self.config.head_dense_units:
+                x = tf.keras.layers.Dense(
+                    units=self.config.head_dense_units,
+                    activation="relu",
+                    name=f"{HEAD_LAYER_PREFIX}dense"
+                )(x)
+            if self.config.head_dropout:
+                x = tf.keras.layers.Dropout(
+                    rate=self.config.head_dropout,
+                    name=f"{HEAD_LAYER_PREFIX}dropout"
+                )(x)
+            output = tf.keras.layers.Dense(
+                units=self.classes,
+                activation="softmax",
+                name=f"{HEAD_LAYER_PREFIX}output"
+            )(x)
 
-        prepared_model = tf.keras.models.Model(
-            inputs=self.model.input,
-            outputs=output
-        )
+            prepared_model = tf.keras.models.Model(
+                inputs=inputs,
+                outputs=output
+            )
 
-        prepared_model.compile(
-            optimizer=self.optimizer.get_optimizer(learning_rate=self.learning_rate),
-            loss=self.loss_function.get_loss(),
-            metrics=["accuracy"]
-        )
+            prepared_model.compile(
+                optimizer=self.optimizer.get_optimizer(
+                    learning_rate=self.learning_rate,
+                    gradient_accumulation_steps=self.config.gradient_accumulation_steps
+                    if self.config.gradient_accumulation_steps > 1 else None
+                ),
+                loss=self.loss_function.get_loss(),
+                metrics=["accuracy"]
+            )
         prepared_model.summary()
 
         return prepared_model
@@ -79,11 +187,31 @@ class BaseModel:
             freeze_all=True,
             freeze_till=None,
         )
-        self.save_model(
+        self.persist_model(
+            key="updated_base_model",
             model=self.updated_model,
             path=self.config.updated_base_model_path
         )
 
+
+    def persist_model(self, key: str, path: Path, model: tf.keras.Model):
+        """
+        Hands the model to later steps through the artifact
+        context and saves a snapshot of it in background, so
+        nobody waits for the write before freezing or training
+        the model. Saves synchronously without a context.
+        Only the chief of a distributed cluster saves.
+        """
+        if not is_chief(self.strategy):
+            return
+        if self.context is not None:
+            snapshot = snapshot_model(model)
+            self.context.put(key, model, path=path,
+                             save=lambda save_path: self.save_model(path=save_path, model=snapshot))
+        else:
+            self.save_model(path=path, model=model)
+
     @staticmethod
     def save_model(path: Path, model: tf.keras.Model):
-        model.save(path)
\ No newline at end of file
+        with profile("model.save"):
+            model.save(path)
\ No newline at end of file
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from src import logger
+from src.config.config_manager import CheckpointConfig
+
+
+CHECKPOINT_PREFIX = "epoch-"
+
+
+def get_checkpoint_key(params: dict, trained_model_path: Path) -> str:
+    """
+    Identifies the training a checkpoint belongs to: checkpoints are
+    only resumed under identical params.yaml and model path, so trials
+    of a sweep with the same params never share a checkpoint directory.
+
+    :param params: params.yaml contents.
+    :param trained_model_path: path the trained model is saved to.
+    :return: key string.
+    """
+    key = json.dumps({"params": params, "trained_model_path": str(Path(trained_model_path))},
+                     sort_keys=True, default=str)
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+class CheckpointManager:
+    """
+    Writes periodic checkpoints of model weights and optimizer state
+    from a background thread and finds the latest one to resume from.
+    Checkpoints live in <root_dir>/<checkpoint key>/epoch-NNNN/.
+    """
+
+    def __init__(self, config: CheckpointConfig, key: str):
+        if config.keep_last < 1:
+            raise ValueError(f"checkpointing.keep_last must be at least 1, got {config.keep_last}.")
+        self.config = config
+        self.checkpoint_dir = Path(config.root_dir) / key
+        self._lock = threading.Lock()
+        self._pending = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint-writer")
+
+
+    def save(self, model: tf.keras.Model, epoch: int, run_id: str = None):
+        """
+        Snapshots the weights and optimizer state on the calling thread,
+        so training can go on mutating them, and writes them in background.
+
+        :param model: model being trained.
+        :param epoch: number of completed epochs.
+        :param run_id: mlflow run the training logs to.
+        """
+        weights = model.get_weights()
+        optimizer_state = [np.array(variable) for variable in model.optimizer.variables]
+        metadata = {"epoch": epoch, "run_id": run_id}
+        with self._lock:
+            self._pending.append(self._executor.submit(self._write, weights, optimizer_state, metadata))
+
+
+    def _write(self, weights: list, optimizer_state: list, metadata: dict):
+        path = self.checkpoint_dir / f"{CHECKPOINT_PREFIX}{metadata['epoch']:04d}"
+        # Write next to the target and rename, so a killed job never leaves a partial checkpoint.
+        partial_path = path.with_name(f".{path.name}.partial")
+        shutil.rmtree(partial_path, ignore_errors=True)
+        os.makedirs(partial_path)
+        np.savez(partial_path / "weights.npz", *weights)
+        np.savez(partial_path / "optimizer.npz", *optimizer_state)
+        with open(partial_path / "checkpoint.json", "w") as f:
+            json.dump(metadata, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(partial_path, path)
+        logger.info(f"Checkpoint of epoch {metadata['epoch']} written to {path}.")
+
+        for old_path in self.list_checkpoints()[:-self.config.keep_last]:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+
+    def list_checkpoints(self) -> list:
+        """
+        :return: paths of the complete checkpoints, oldest first.
+        """
+        if not self.checkpoint_dir.exists():
+            return []
+        return sorted(path for path in self.checkpoint_dir.iterdir()
+                      if path.name.startswith(CHECKPOINT_PREFIX) and (path / "checkpoint.json").exists())
+
+
+    def get_resume_checkpoint(self, n_epochs: int) -> dict:
+        """
+        Latest checkpoint of an unfinished training with this key.
+
+        :param n_epochs: epochs the training runs for.
+        :return: {"path", "epoch", "run_id"}, None if there is nothing to resume.
+        """
+        checkpoints = self.list_checkpoints()
+        if not checkpoints:
+            return None
+        with open(checkpoints[-1] / "checkpoint.json") as f:
+            checkpoint = {"path": checkpoints[-1], **json.load(f)}
+        return checkpoint if checkpoint["epoch"] < n_epochs else None
+
+
+    def clear(self):
+        """
+        Removes the checkpoints of an earlier, finished training with
+        this key, so they are not mistaken for the latest one.
+        """
+        shutil.rmtree(self.checkpoint_dir, ignore_errors=True)
+
+
+    @staticmethod
+    def restore(model: tf.keras.Model, checkpoint: dict):
+        """
+        Loads the weights and optimizer state of a checkpoint into a compiled model.
+
+        :param model: model built from the same params.
+        :param checkpoint: checkpoint returned by get_resume_checkpoint.
+        """
+        with np.load(checkpoint["path"] / "weights.npz") as weights:
+            model.set_weights([weights[f"arr_{i}"] for i in range(len(weights.files))])
+
+        optimizer = model.optimizer
+        if not optimizer.built:
+            optimizer.build(model.trainable_variables)
+        with np.load(checkpoint["path"] / "optimizer.npz") as state:
+            if len(state.files) != len(optimizer.variables):
+                raise ValueError(f"Checkpoint {checkpoint['path']} holds {len(state.files)} optimizer variables, "
+                                 f"the model's optimizer has {len(optimizer.variables)}.")
+            for i, variable in enumerate(optimizer.variables):
+                variable.assign(state[f"arr_{i}"])
+        logger.info(f"Resumed from checkpoint {checkpoint['path']} after epoch {checkpoint['epoch']}.")
+
+
+    def close(self):
+        """
+        Waits for pending checkpoint writes and stops the writer.
+        """
+        with self._lock:
+            futures = list(self._pending)
+        for future in futures:
+            future.result()
+        self._executor.shutdown(wait=True)
+
+
+class CheckpointCallback(tf.keras.callbacks.Callback):
+    """
+    Hands a checkpoint to the CheckpointManager every n epochs.
+    """
+
+    def __init__(self, checkpoint_manager: CheckpointManager, every_n_epochs: int, run_id: str = None):
+        super().__init__()
+        self.checkpoint_manager = checkpoint_manager
+        self.every_n_epochs = every_n_epochs
+        self.run_id = run_id
+
+    def on_epoch_end(self, epoch, logs=None):
+        if (epoch + 1) % self.every_n_epochs == 0:
+            self.checkpoint_manager.save(self.model, epoch=epoch + 1, run_id=self.run_id)
@@ -1,12 +1,109 @@
+import json
 import os
+import shutil
 import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from src import logger
 from abc import ABC, abstractmethod
 import kaggle
 import gdown
 from gdown.exceptions import FileURLRetrievalError
 
+from src.components.profiler import profile
+from src.components.zip_dataset import ZipFilePool
 from src.config.config_manager import DataIngestionConfig
+from src.utils.utils import get_file_hash
+
+
+EXTRACTION_MARKER = ".extraction_complete.json"
+
+
+def _is_member_extracted(info: zipfile.ZipInfo, target_path: str) -> bool:
+    """
+    Checks whether an extracted file already matches the archive member.
+    """
+    if not os.path.isfile(target_path) or os.path.getsize(target_path) != info.file_size:
+        return False
+    crc = 0
+    with open(target_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc == info.CRC
+
+
+def _extract_member(zip_pool: ZipFilePool, info: zipfile.ZipInfo, extract_to: str) -> bool:
+    """
+    Extracts one member unless an identical file already exists.
+
+    :return: True if the member was written.
+    """
+    target_path = os.path.realpath(os.path.join(extract_to, info.filename))
+    if not target_path.startswith(os.path.realpath(extract_to) + os.sep):
+        raise ValueError(f"Archive member {info.filename} points outside of {extract_to}.")
+
+    if info.is_dir():
+        os.makedirs(target_path, exist_ok=True)
+        return False
+    if _is_member_extracted(info, target_path):
+        return False
+
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    partial_path = f"{target_path}.part"
+    with zip_pool.get_handle().open(info) as source, open(partial_path, "wb") as target:
+        shutil.copyfileobj(source, target, 1 << 20)
+    os.replace(partial_path, target_path)
+    return True
+
+
+@profile("zip extraction")
+def extract_archive(file_path: str, extract_to: str):
+    """
+    Extracts a zip archive across a thread pool, skipping members
+    whose files already match and skipping the whole archive when
+    the completion marker holds the same archive hash and the
+    extracted top-level entries still exist.
+
+    :param file_path: path to the zip archive.
+    :param extract_to: destination directory.
+    """
+    stat = os.stat(file_path)
+    marker_path = os.path.join(extract_to, EXTRACTION_MARKER)
+    marker = None
+    if os.path.exists(marker_path):
+        with open(marker_path) as f:
+            marker = json.load(f)
+        # A marker is only trusted while the tree it describes is still on disk.
+        roots = marker.get("roots")
+        if roots is None or not all(os.path.exists(os.path.join(extract_to, root)) for root in roots):
+            logger.info(f"Extracted files of {file_path} are missing, extracting again.")
+            os.remove(marker_path)
+            marker = None
+
+    if marker is not None and marker["size"] == stat.st_size and marker["mtime"] == stat.st_mtime_ns:
+        logger.info(f"{file_path} is unchanged since the last extraction, skipping.")
+        return
+
+    archive_hash = get_file_hash(file_path)
+    with zipfile.ZipFile(file_path, "r") as zip_file:
+        members = zip_file.infolist()
+    roots = sorted({info.filename.split("/", 1)[0] for info in members if info.filename.split("/", 1)[0]})
+
+    if marker is None or marker["hash"] != archive_hash:
+        os.makedirs(extract_to, exist_ok=True)
+
+        zip_pool = ZipFilePool(zip_path=file_path)
+        try:
+            with ThreadPoolExecutor() as executor:
+                written = sum(executor.map(lambda info: _extract_member(zip_pool, info, extract_to), members))
+        finally:
+            zip_pool.close()
+        logger.info(f"Extracted {written} of {len(members)} members, the rest were up to date.")
+    else:
+        logger.info(f"{file_path} content is unchanged since the last extraction, skipping.")
+
+    with open(marker_path, "w") as f:
+        json.dump({"hash": archive_hash, "size": stat.st_size, "mtime": stat.st_mtime_ns, "roots": roots}, f)
 
 
 class DataIngestor(ABC):
@@ -47,11 +144,14 @@ class LocalDataIngestor(DataIngestor):
         file_path = self.config.sourceURL
         extract_to = self.config.extract_to
 
+        if not self.config.extract:
+            logger.info(f"Skipping extraction, data will be read directly from {file_path}.")
+            return
+
         logger.info(f"Extracting data from {file_path} to {extract_to}.")
 
         # Extract data from zip file
-        with zipfile.ZipFile(file_path, "r") as zip_file:
-            zip_file.extractall(extract_to)
+        extract_archive(file_path=file_path, extract_to=extract_to)
         logger.info(f"Data extraction complete for {file_path}.")
 
 
@@ -84,9 +184,9 @@ class KaggleDataIngestor(DataIngestor):
 
         # Authenticate and download dataset using Kaggle API
         kaggle.api.authenticate()
-        kaggle.api.dataset_download_files(dataset, path=extract_to, unzip=True)
+        kaggle.api.dataset_download_files(dataset, path=extract_to, unzip=self.config.extract)
 
-        logger.info(f"Kaggle dataset {dataset} downloaded and extracted to {extract_to}.")
+        logger.info(f"Kaggle dataset {dataset} downloaded to {extract_to}.")
 
 
 class GoogleDriveDataIngestor(DataIngestor):
@@ -130,9 +230,8 @@ class GoogleDriveDataIngestor(DataIngestor):
             logger.info(f"The file with ID: '{gdrive_file_id}' is not publicly accessible.")
             raise ValueError(f"Change the permissions of the file to publicly accessible. \n{e}")
 
-        if output_path.endswith('.zip'):
-            with zipfile.ZipFile(output_path, 'r') as zip_file:
-                zip_file.extractall(extract_to)
+        if output_path.endswith('.zip') and self.config.extract:
+            extract_archive(file_path=output_path, extract_to=extract_to)
             logger.info(f"Data extracted from Google Drive zip file to {extract_to}.")
 
 
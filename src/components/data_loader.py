@@ -0,0 +1,318 @@
+from abc import ABC, abstractmethod
+
+import tensorflow as tf
+from keras.src.legacy.preprocessing.image import ImageDataGenerator
+
+from src import logger
+from src.components.image_augmentation import augment_images, ROTATION_RANGE, WIDTH_SHIFT_RANGE, \
+    HEIGHT_SHIFT_RANGE, SHEAR_RANGE, ZOOM_RANGE, HORIZONTAL_FLIP
+from src.components.image_cache import ImageCache, CachedImageBatches
+from src.components.image_loader import ScaledDirectoryIterator, decode_image_tensor
+from src.components.profiler import profile
+from src.components.tfrecord_exporter import read_manifest, parse_example
+from src.components.zip_dataset import ZipIndex, ZipFilePool
+from src.config.config_manager import DataPreprocessingConfig
+from src.utils.utils import list_image_files
+
+
+def get_steps(data) -> int:
+    """
+    Number of steps per epoch to pass to model.fit.
+    Keras generators loop forever and need an explicit count,
+    finite datasets are consumed until exhausted.
+
+    :param data: batches returned by a DataLoader.
+    :return: steps per epoch or None.
+    """
+    if hasattr(data, "samples") and hasattr(data, "batch_size"):
+        return data.samples // data.batch_size
+    return None
+
+
+def limit_batches(data, fraction: float) -> tuple:
+    """
+    Restricts an epoch to a fraction of the batches, used to
+    train on a reduced data budget.
+
+    :param data: batches returned by a DataLoader.
+    :param fraction: share of batches per epoch, 1 keeps all.
+    :return: (batches, steps per epoch to pass to model.fit).
+    """
+    steps = get_steps(data)
+    if fraction >= 1:
+        return data, steps
+    if isinstance(data, tf.data.Dataset):
+        return data.take(max(1, int(len(data) * fraction))), None
+    return data, max(1, int((steps if steps is not None else len(data)) * fraction))
+
+
+def iterate_batches(data):
+    """
+    Iterates once over the batches returned by a DataLoader.
+
+    :param data: keras generator/PyDataset or tf.data.Dataset.
+    :return: generator of (images, labels) numpy batches.
+    """
+    if isinstance(data, tf.data.Dataset):
+        yield from data.as_numpy_iterator()
+    else:
+        for index in range(len(data)):
+            yield data[index]
+
+
+class DataLoader(ABC):
+    """
+    Abstract base class for input pipeline backends.
+    """
+
+    def __init__(self, config: DataPreprocessingConfig):
+        self.config = config
+
+    @abstractmethod
+    def load(self, split: str, shuffle: bool, augment: bool):
+        """
+        Builds batches of (images, one-hot labels) for a data split.
+
+        :param split: name of the split directory (train, valid, test).
+        :param shuffle: whether to shuffle samples every epoch.
+        :param augment: whether to apply random augmentation.
+        :return: batches consumable by keras Model.fit/evaluate.
+        """
+        pass
+
+
+class ImageGeneratorDataLoader(DataLoader):
+    """
+    Input pipeline based on keras ImageDataGenerator.flow_from_directory.
+    """
+
+    def create_image_data_generator(self, augmentation: bool) -> ImageDataGenerator:
+        # Models with embedded preprocessing rescale in-graph.
+        rescale = None if self.config.embed_preprocessing else 1./255
+        if augmentation:
+            return ImageDataGenerator(
+                rescale=rescale,
+                rotation_range=ROTATION_RANGE,
+                horizontal_flip=HORIZONTAL_FLIP,
+                width_shift_range=WIDTH_SHIFT_RANGE,
+                height_shift_range=HEIGHT_SHIFT_RANGE,
+                shear_range=SHEAR_RANGE,
+                zoom_range=ZOOM_RANGE,
+                validation_split=0.20
+            )
+        else:
+            return ImageDataGenerator(
+                rescale=rescale,
+                validation_split=0.20
+            )
+
+    def load(self, split: str, shuffle: bool, augment: bool):
+        generator = self.create_image_data_generator(augmentation=augment)
+        # Same as generator.flow_from_directory, with reduced-scale JPEG decoding.
+        with profile("flow_from_directory"):
+            return ScaledDirectoryIterator(
+                directory=self.config.training_data / split,
+                image_data_generator=generator,
+                shuffle=shuffle,
+                target_size=self.config.img_size[:-1],
+                batch_size=self.config.batch_size,
+                interpolation="bilinear",
+                data_format=generator.data_format,
+                dtype=generator.dtype
+            )
+
+
+class TFDataLoader(DataLoader):
+    """
+    Input pipeline based on tf.data with parallel decoding,
+    in-graph augmentation, caching and prefetching.
+    """
+
+    def get_source(self, split: str) -> tuple:
+        """
+        Builds a dataset of (encoded image bytes, one-hot label).
+
+        :param split: name of the split directory (train, valid, test).
+        :return: (dataset, number of samples).
+        """
+        file_paths, labels, class_names = list_image_files(self.config.training_data / split)
+        logger.info(f"Found {len(file_paths)} images belonging to {len(class_names)} classes.")
+
+        dataset = tf.data.Dataset.from_tensor_slices(
+            (file_paths, tf.one_hot(labels, depth=len(class_names)))
+        )
+        dataset = dataset.map(
+            lambda path, label: (tf.io.read_file(path), label),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=self.config.deterministic
+        )
+        return dataset, len(file_paths)
+
+    def decode(self, contents: tf.Tensor) -> tf.Tensor:
+        """
+        Decodes and resizes an encoded image to a uint8 tensor.
+        """
+        return decode_image_tensor(contents, self.config.img_size[:-1])
+
+    def load(self, split: str, shuffle: bool, augment: bool) -> tf.data.Dataset:
+        dataset, n_samples = self.get_source(split)
+        if self.config.num_shards > 1:
+            # Equal shards, so every worker runs the same number of steps.
+            n_samples = n_samples // self.config.num_shards
+            dataset = dataset.take(n_samples * self.config.num_shards).shard(
+                self.config.num_shards, self.config.shard_index
+            )
+
+        # Cache compact uint8 images, everything after this runs per epoch.
+        dataset = dataset.map(
+            lambda contents, label: (self.decode(contents), label),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=self.config.deterministic
+        ).cache()
+
+        if shuffle:
+            dataset = dataset.shuffle(n_samples, seed=self.config.seed, reshuffle_each_iteration=True)
+        dataset = dataset.batch(self.config.batch_size)
+        # Models with embedded preprocessing take the compact uint8 batches as they are.
+        if not self.config.embed_preprocessing:
+            dataset = dataset.map(
+                lambda images, labels: (tf.cast(images, tf.float32) * (1. / 255), labels),
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=self.config.deterministic
+            )
+
+        if augment:
+            seeds = tf.data.Dataset.random(seed=self.config.seed, rerandomize_each_iteration=True).batch(2)
+            dataset = tf.data.Dataset.zip((dataset, seeds)).map(
+                lambda batch, seed: (augment_images(batch[0], seed), batch[1]),
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=self.config.deterministic
+            )
+
+        options = tf.data.Options()
+        options.deterministic = self.config.deterministic
+        if self.config.num_shards > 1:
+            # Already sharded per worker, keras must not shard again.
+            options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.OFF
+        return dataset.with_options(options).prefetch(tf.data.AUTOTUNE)
+
+
+class TFRecordDataLoader(TFDataLoader):
+    """
+    tf.data input pipeline reading the exported TFRecord
+    shards, interleaved in parallel for sequential I/O.
+    """
+
+    def get_source(self, split: str) -> tuple:
+        manifest = read_manifest(self.config.tfrecord_dir)
+        split_manifest = manifest["splits"][split]
+        n_classes = len(split_manifest["class_names"])
+        n_samples = split_manifest["samples"]
+        shard_paths = [str(self.config.tfrecord_dir / shard["file"]) for shard in split_manifest["shards"]]
+        logger.info(f"Found {n_samples} images belonging to {n_classes} classes in {len(shard_paths)} shards.")
+
+        # An empty split has no shards, interleave still needs a cycle length of at least 1.
+        dataset = tf.data.Dataset.from_tensor_slices(tf.constant(shard_paths, dtype=tf.string)).interleave(
+            lambda path: tf.data.TFRecordDataset(path, compression_type=manifest["compression"] or ""),
+            cycle_length=max(1, len(shard_paths)),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=self.config.deterministic
+        )
+        dataset = dataset.map(
+            lambda serialized: self._parse(serialized, n_classes),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=self.config.deterministic
+        )
+        return dataset.apply(tf.data.experimental.assert_cardinality(n_samples)), n_samples
+
+    @staticmethod
+    def _parse(serialized: tf.Tensor, n_classes: int) -> tuple:
+        contents, label = parse_example(serialized)
+        return contents, tf.one_hot(label, depth=n_classes)
+
+
+class ZipDataLoader(TFDataLoader):
+    """
+    tf.data input pipeline reading images straight from the
+    source archive through a pool of per-thread ZipFile handles.
+    """
+
+    def __init__(self, config: DataPreprocessingConfig):
+        super().__init__(config)
+        self.zip_index = ZipIndex(zip_path=config.source_zip, index_dir=config.zip_index_dir)
+        self.zip_pool = ZipFilePool(zip_path=config.source_zip)
+
+    def get_source(self, split: str) -> tuple:
+        names, labels, class_names = self.zip_index.get_split(split)
+        logger.info(f"Found {len(names)} images belonging to {len(class_names)} classes in {self.config.source_zip}.")
+
+        dataset = tf.data.Dataset.from_tensor_slices(
+            (names, tf.one_hot(labels, depth=len(class_names)))
+        )
+        dataset = dataset.map(
+            lambda name, label: (self._read_member(name), label),
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=self.config.deterministic
+        )
+        return dataset, len(names)
+
+    def _read_member(self, name: tf.Tensor) -> tf.Tensor:
+        contents = tf.numpy_function(self.zip_pool.read, [name], tf.string, stateful=False)
+        contents.set_shape([])
+        return contents
+
+
+class MemmapDataLoader(DataLoader):
+    """
+    Input pipeline serving batches from the decoded uint8 image cache.
+    """
+
+    def __init__(self, config: DataPreprocessingConfig):
+        super().__init__(config)
+        self.image_cache = ImageCache(
+            root_dir=config.image_cache_dir,
+            training_data=config.training_data,
+            img_size=config.img_size,
+            seed=config.seed
+        )
+
+    def load(self, split: str, shuffle: bool, augment: bool) -> CachedImageBatches:
+        images, labels, class_names = self.image_cache.get_split(split)
+        logger.info(f"Found {len(images)} images belonging to {len(class_names)} classes.")
+        return CachedImageBatches(
+            images=images,
+            labels=labels,
+            n_classes=len(class_names),
+            batch_size=self.config.batch_size,
+            shuffle=shuffle,
+            augment=augment,
+            rescale=not self.config.embed_preprocessing,
+            seed=self.config.seed
+        )
+
+
+class DataLoaderFactory:
+    """
+    Factory class to get the configured input pipeline backend.
+    """
+
+    @staticmethod
+    def get_data_loader(config: DataPreprocessingConfig) -> DataLoader:
+        """
+        Factory method to select data loader based on config.
+
+        :param config: data preprocessing configuration.
+        :return: An instance of a DataLoader class.
+        """
+        if config.data_backend == "generator":
+            return ImageGeneratorDataLoader(config)
+        elif config.data_backend == "tf_data":
+            return TFDataLoader(config)
+        elif config.data_backend == "memmap":
+            return MemmapDataLoader(config)
+        elif config.data_backend == "tfrecord":
+            return TFRecordDataLoader(config)
+        elif config.data_backend == "zip":
+            return ZipDataLoader(config)
+        else:
+            raise ValueError(f"Unsupported data backend: {config.data_backend}")
@@ -0,0 +1,87 @@
+import contextlib
+import json
+import os
+
+import tensorflow as tf
+
+from src import logger
+from src.config.config_manager import DistributedTrainingConfig
+
+
+# Input pipelines that can be sharded explicitly per worker.
+SHARDABLE_BACKENDS = ("tf_data", "tfrecord", "zip")
+
+
+def get_tf_config(config: DistributedTrainingConfig) -> dict:
+    """
+    Cluster definition of this process, from the TF_CONFIG
+    environment or else from the workers in config.yaml.
+
+    :param config: distributed training configuration.
+    :return: TF_CONFIG dict with "cluster" and "task".
+    """
+    if "TF_CONFIG" in os.environ:
+        return json.loads(os.environ["TF_CONFIG"])
+    if not config.workers:
+        raise ValueError("Distributed training needs TF_CONFIG or distributed_training.workers in config.yaml.")
+    return {
+        "cluster": {"worker": list(config.workers)},
+        "task": {"type": "worker", "index": config.task_index}
+    }
+
+
+def get_strategy(config: DistributedTrainingConfig) -> tf.distribute.Strategy:
+    """
+    Creates the MultiWorkerMirroredStrategy of the cluster.
+    Must run before any other TensorFlow op of the process.
+
+    :param config: distributed training configuration.
+    :return: tf.distribute Strategy.
+    """
+    tf_config = get_tf_config(config)
+    os.environ["TF_CONFIG"] = json.dumps(tf_config)
+    implementation = {
+        "auto": tf.distribute.experimental.CommunicationImplementation.AUTO,
+        "ring": tf.distribute.experimental.CommunicationImplementation.RING
+    }[config.communication]
+    strategy = tf.distribute.MultiWorkerMirroredStrategy(
+        communication_options=tf.distribute.experimental.CommunicationOptions(implementation=implementation)
+    )
+    logger.info(f"Worker {tf_config['task']} joined a cluster of {strategy.num_replicas_in_sync} replicas.")
+    return strategy
+
+
+def get_worker_shard(strategy: tf.distribute.Strategy) -> tuple:
+    """
+    :param strategy: tf.distribute Strategy.
+    :return: (number of workers, index of this worker) for sharding the input.
+    """
+    resolver = getattr(strategy, "cluster_resolver", None)
+    if resolver is None or resolver.task_type is None:
+        return 1, 0
+    cluster = resolver.cluster_spec().as_dict()
+    n_chief = len(cluster.get("chief", []))
+    n_workers = n_chief + len(cluster.get("worker", []))
+    index = resolver.task_id + (n_chief if resolver.task_type == "worker" else 0)
+    return n_workers, index
+
+
+def is_chief(strategy: tf.distribute.Strategy = None) -> bool:
+    """
+    Whether this process saves models and logs to MLflow:
+    the chief task, or worker 0 of a cluster without one.
+    """
+    resolver = getattr(strategy, "cluster_resolver", None)
+    if resolver is None or resolver.task_type is None:
+        return True
+    if resolver.task_type == "chief":
+        return True
+    return resolver.task_type == "worker" and resolver.task_id == 0 \
+        and "chief" not in resolver.cluster_spec().as_dict()
+
+
+def get_scope(strategy: tf.distribute.Strategy = None):
+    """
+    Variable creation scope of the strategy, a no-op without one.
+    """
+    return strategy.scope() if strategy is not None else contextlib.nullcontext()
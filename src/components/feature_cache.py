@@ -0,0 +1,192 @@
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from src import logger
+from src.components.base_model import HEAD_LAYER_PREFIX
+from src.components.data_loader import iterate_batches
+from src.config.config_manager import FeatureCacheConfig
+from src.utils.utils import get_directory_fingerprint, create_directories
+
+
+def split_model_head(model: tf.keras.Model) -> tuple:
+    """
+    Splits a prepared model into the frozen backbone and
+    the classification head layers added by BaseModel.
+
+    :param model: model built by BaseModel.prepare_model.
+    :return: (backbone Model producing head inputs, list of head layers).
+    """
+    head_layers = [layer for layer in model.layers if layer.name.startswith(HEAD_LAYER_PREFIX)]
+    if not head_layers:
+        raise ValueError(f"Model has no '{HEAD_LAYER_PREFIX}' layers. Re-run the model initialization step.")
+
+    backbone = tf.keras.models.Model(
+        inputs=model.inputs,
+        outputs=model.get_layer(head_layers[0].name).input
+    )
+    return backbone, head_layers
+
+
+def build_head_model(model: tf.keras.Model, feature_shape: tuple) -> tf.keras.Model:
+    """
+    Builds a model over cached backbone features that shares its
+    head layers (and weights) with the prepared model. The head is
+    compiled with the model's own optimizer, its slots are keyed by
+    the shared head variables, so continued training (e.g. a promoted
+    sweep trial) keeps the optimizer state and iteration count.
+
+    :param model: compiled model built by BaseModel.prepare_model.
+    :param feature_shape: shape of one backbone feature tensor.
+    :return: compiled head Model.
+    """
+    _, head_layers = split_model_head(model)
+
+    features_in = tf.keras.layers.Input(shape=feature_shape)
+    output = features_in
+    for layer in head_layers:
+        output = layer(output)
+
+    head_model = tf.keras.models.Model(inputs=features_in, outputs=output)
+    head_model.compile(
+        optimizer=model.optimizer,
+        loss=model.loss,
+        metrics=["accuracy"]
+    )
+    return head_model
+
+
+class FeatureBatches(tf.keras.utils.PyDataset):
+    """
+    Serves batches of memory-mapped features and labels.
+    """
+
+    def __init__(self, features: np.ndarray, labels: np.ndarray, batch_size: int, shuffle: bool,
+                 seed: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.features = features
+        self.labels = labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.indices = np.arange(len(features))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return math.ceil(len(self.features) / self.batch_size)
+
+    def __getitem__(self, index):
+        batch_indices = self.indices[index * self.batch_size:(index + 1) * self.batch_size]
+        # Sorted reads keep page cache access sequential within a batch.
+        batch_indices = np.sort(batch_indices)
+        return self.features[batch_indices], self.labels[batch_indices]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+
+
+class FeatureCache:
+    """
+    On-disk cache of backbone features keyed by model type,
+    image size, backbone weights and dataset fingerprint.
+    """
+
+    def __init__(self, config: FeatureCacheConfig):
+        self.config = config
+
+
+    def get_cache_dir(self, split: str, backbone: tf.keras.Model) -> Path:
+        """
+        Resolves the cache directory for one data split.
+
+        :param split: name of the split directory (train, valid, test).
+        :param backbone: frozen feature extractor.
+        :return: path of the split cache.
+        """
+        weights_digest = hashlib.sha256()
+        for weights in backbone.get_weights():
+            weights_digest.update(np.ascontiguousarray(weights).tobytes())
+
+        split_dir = self.config.training_data / split
+        if split_dir.exists():
+            data_fingerprint = get_directory_fingerprint(split_dir)
+        else:
+            # Training straight from the archive, nothing was extracted.
+            stat = os.stat(self.config.source_zip)
+            data_fingerprint = f"{self.config.source_zip}:{stat.st_size}:{stat.st_mtime_ns}"
+
+        key = json.dumps({
+            "model_type": self.config.model_type,
+            "img_size": list(self.config.img_size),
+            "weights": weights_digest.hexdigest(),
+            "data": data_fingerprint
+        }, sort_keys=True)
+        cache_key = hashlib.sha256(key.encode()).hexdigest()[:16]
+
+        return self.config.root_dir / f"{self.config.model_type}_{split}_{cache_key}"
+
+
+    def get_features(self, split: str, model: tf.keras.Model, data) -> tuple:
+        """
+        Returns memory-mapped backbone features of a split,
+        running the backbone once if they are not cached yet.
+
+        :param split: name of the split directory (train, valid, test).
+        :param model: model built by BaseModel.prepare_model.
+        :param data: non-augmented batches of the split.
+        :return: (features, labels) memory-mapped arrays.
+        """
+        backbone, _ = split_model_head(model)
+        cache_dir = self.get_cache_dir(split=split, backbone=backbone)
+
+        if not (cache_dir / "meta.json").exists():
+            self._extract(cache_dir=cache_dir, backbone=backbone, data=data)
+        else:
+            logger.info(f"Using cached {split} features from {cache_dir}.")
+
+        with open(cache_dir / "meta.json") as f:
+            meta = json.load(f)
+
+        features = np.memmap(cache_dir / "features.bin", dtype=meta["features_dtype"],
+                             mode="r", shape=tuple(meta["features_shape"]))
+        labels = np.memmap(cache_dir / "labels.bin", dtype=meta["labels_dtype"],
+                           mode="r", shape=tuple(meta["labels_shape"]))
+        return features, labels
+
+
+    @staticmethod
+    def _extract(cache_dir: Path, backbone: tf.keras.Model, data):
+        logger.info(f"Extracting backbone features to {cache_dir}.")
+        create_directories([cache_dir])
+
+        n_samples = 0
+        features_shape = labels_shape = None
+        with open(cache_dir / "features.bin.tmp", "wb") as features_file, \
+                open(cache_dir / "labels.bin.tmp", "wb") as labels_file:
+            for images, labels in iterate_batches(data):
+                features = np.asarray(backbone.predict_on_batch(images), dtype="float32")
+                labels = np.asarray(labels, dtype="float32")
+
+                features_file.write(features.tobytes())
+                labels_file.write(labels.tobytes())
+                n_samples += len(features)
+                features_shape, labels_shape = features.shape[1:], labels.shape[1:]
+
+        os.replace(cache_dir / "features.bin.tmp", cache_dir / "features.bin")
+        os.replace(cache_dir / "labels.bin.tmp", cache_dir / "labels.bin")
+
+        # meta.json is written last and marks the cache as complete.
+        with open(cache_dir / "meta.json", "w") as f:
+            json.dump({
+                "features_shape": [n_samples, *features_shape],
+                "features_dtype": "float32",
+                "labels_shape": [n_samples, *labels_shape],
+                "labels_dtype": "float32"
+            }, f)
+        logger.info(f"Cached features of {n_samples} samples.")
@@ -0,0 +1,222 @@
+import itertools
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import mlflow
+
+from src import logger
+from src.config.config import ConfigManager
+from src.config.config_manager import HyperparameterSweepConfig
+
+
+def generate_trials(space: dict, search: str, n_trials: int, seed: int = None) -> list:
+    """
+    Expands a search space over params.yaml keys into trial params.
+
+    :param space: {PARAM: [choices]} for grid search, random search
+                  also accepts {PARAM: {"min": .., "max": .., "log": bool}}.
+    :param search: "grid" or "random".
+    :param n_trials: number of sampled trials for random search.
+    :param seed: random search seed.
+    :return: list of {PARAM: value} dicts.
+    """
+    keys = sorted(space)
+    if search == "grid":
+        for key in keys:
+            if not isinstance(space[key], list):
+                raise ValueError(f"Grid search requires a list of choices for {key}.")
+        return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+    elif search == "random":
+        rng = random.Random(seed)
+
+        def sample(values):
+            if isinstance(values, list):
+                return rng.choice(values)
+            if values.get("log"):
+                return math.exp(rng.uniform(math.log(values["min"]), math.log(values["max"])))
+            return rng.uniform(values["min"], values["max"])
+
+        return [{key: sample(space[key]) for key in keys} for _ in range(n_trials)]
+
+    else:
+        raise ValueError(f"Unsupported search strategy: {search}")
+
+
+def get_thread_limits(max_workers: int) -> tuple:
+    """
+    Partitions the machine's cores between concurrent trials.
+
+    :param max_workers: number of concurrent trials.
+    :return: (intra-op threads, inter-op threads) per trial.
+    """
+    cores_per_trial = max(1, (os.cpu_count() or 1) // max_workers)
+    inter_op_threads = 2 if cores_per_trial >= 4 else 1
+    return cores_per_trial, inter_op_threads
+
+
+def init_trial_worker(intra_op_threads: int, inter_op_threads: int):
+    """
+    Process pool initializer limiting the threads of one trial.
+    Runs before TensorFlow creates its thread pools.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(intra_op_threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def prepare_trial_config(trial_params: dict, trial_dir: Path, shared_data_backend: str = None) -> ConfigManager:
+    """
+    Builds the configuration of one trial: params.yaml overridden
+    by the trial params and model artifacts isolated per trial.
+
+    :param trial_params: {PARAM: value} overrides.
+    :param trial_dir: directory for the trial's models.
+    :param shared_data_backend: backend all trials read data from.
+    :return: ConfigManager of the trial.
+    """
+    config = ConfigManager()
+    config.params.update(trial_params)
+    if shared_data_backend is not None:
+        config.params["DATA_BACKEND"] = shared_data_backend
+
+    config.config["base_model"] = {
+        "root_dir": str(trial_dir / "base_model"),
+        "base_model_path": str(trial_dir / "base_model" / "base_model.keras"),
+        "updated_base_model_path": str(trial_dir / "base_model" / "updated_base_model.keras")
+    }
+    config.config["model_training"] = {
+        **config.config["model_training"],
+        "root_dir": str(trial_dir / "training"),
+        "trained_model_path": str(trial_dir / "training" / "model.keras")
+    }
+    return config
+
+
+def run_trial(trial_id: int, trial_params: dict, trial_dir: Path, parent_run_id: str,
+              experiment_name: str, shared_data_backend: str = None) -> dict:
+    """
+    Runs model preparation, training and evaluation of one trial
+    as a nested MLflow run. Executed inside a pool worker.
+
+    :return: trial summary with evaluation scores.
+    """
+    # Imported here so TensorFlow is first loaded after init_trial_worker set the thread limits.
+    from src.components.artifact_context import ArtifactContext
+    from src.components.profiler import get_profiler
+    from steps.model_evaluation_step import model_evaluation_step
+    from steps.model_preparation_step import model_initialization_step
+    from steps.model_training_step import model_training_step
+
+    config = prepare_trial_config(trial_params=trial_params, trial_dir=trial_dir,
+                                  shared_data_backend=shared_data_backend)
+
+    mlflow.set_experiment(experiment_name)
+    with mlflow.start_run(run_name=f"trial-{trial_id:03d}", parent_run_id=parent_run_id, nested=True) as run:
+        mlflow.log_params(config.params)
+        context = ArtifactContext()
+        model_initialization_step(config=config, context=context)
+        model_training_step(config=config, context=context)
+        scores = model_evaluation_step(config=config, context=context)
+        context.close()
+        get_profiler().log_to_mlflow()
+
+    return {"trial": trial_id, "run_id": run.info.run_id, "params": trial_params, "scores": scores}
+
+
+class HyperparameterSweep:
+    """
+    Runs a grid or random search over params.yaml keys
+    across a process pool, one nested MLflow run per trial.
+    """
+
+    def __init__(self, config: HyperparameterSweepConfig):
+        self.config = config
+        self.results = []
+
+
+    def prepare_shared_data(self, trials: list, base_config: ConfigManager):
+        """
+        Decodes every split once into the shared uint8 image cache
+        (per distinct IMAGE_SIZE) so trials do not re-read images.
+        The cache is built from the extracted splits, which the data
+        ingestion step skips for DATA_BACKEND zip.
+        """
+        from src.components.image_cache import ImageCache
+
+        data_config = base_config.get_data_preprocessing_config()
+        if data_config.data_backend == "zip":
+            raise ValueError("Sweeps share a memmap image cache built from the extracted splits and cannot run "
+                             "with DATA_BACKEND zip. Set DATA_BACKEND to another backend and re-run data ingestion.")
+        img_sizes = {tuple(trial.get("IMAGE_SIZE", base_config.params["IMAGE_SIZE"])) for trial in trials}
+        for img_size in img_sizes:
+            image_cache = ImageCache(root_dir=data_config.image_cache_dir,
+                                     training_data=data_config.training_data,
+                                     img_size=list(img_size),
+                                     seed=data_config.seed)
+            for split in ("train", "valid", "test"):
+                image_cache.get_split(split)
+
+
+    def get_best_trial(self) -> dict:
+        completed = [result for result in self.results if result.get("scores")]
+        if not completed:
+            return None
+        return max(completed, key=lambda result: result["scores"][self.config.metric])
+
+
+    def run(self, base_config: ConfigManager, experiment_name: str) -> list:
+        """
+        Runs every trial and logs a summary to the active parent run.
+
+        :param base_config: ConfigManager of the unmodified params.yaml.
+        :param experiment_name: MLflow experiment of the parent run.
+        :return: list of trial summaries.
+        """
+        trials = generate_trials(space=self.config.space, search=self.config.search,
+                                 n_trials=self.config.n_trials, seed=self.config.seed)
+        logger.info(f"Sweep of {len(trials)} trials over {sorted(self.config.space)} started.")
+
+        self.prepare_shared_data(trials=trials, base_config=base_config)
+
+        parent_run_id = mlflow.active_run().info.run_id
+        intra_op_threads, inter_op_threads = get_thread_limits(self.config.max_workers)
+        logger.info(f"Running {self.config.max_workers} trials at a time with "
+                    f"{intra_op_threads} intra-op / {inter_op_threads} inter-op threads each.")
+
+        # Spawned workers start TensorFlow from scratch so thread limits apply.
+        with ProcessPoolExecutor(max_workers=self.config.max_workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=init_trial_worker,
+                                 initargs=(intra_op_threads, inter_op_threads)) as executor:
+            futures = {
+                executor.submit(run_trial, trial_id, trial_params,
+                                self.config.root_dir / f"trial_{trial_id:03d}",
+                                parent_run_id, experiment_name, "memmap"): (trial_id, trial_params)
+                for trial_id, trial_params in enumerate(trials)
+            }
+            for future in as_completed(futures):
+                trial_id, trial_params = futures[future]
+                try:
+                    result = future.result()
+                    logger.info(f"Trial {trial_id} finished with {result['scores']}.")
+                except Exception as e:
+                    logger.info(f"Trial {trial_id} failed: {e}")
+                    result = {"trial": trial_id, "params": trial_params, "scores": None, "error": str(e)}
+                self.results.append(result)
+
+        self.results.sort(key=lambda result: result["trial"])
+        mlflow.log_dict({"trials": self.results}, "sweep_results.json")
+
+        best_trial = self.get_best_trial()
+        if best_trial is not None:
+            mlflow.log_metric(f"best_{self.config.metric}", best_trial["scores"][self.config.metric])
+            mlflow.set_tag("best_trial_run_id", best_trial["run_id"])
+            logger.info(f"Best trial {best_trial['trial']}: {best_trial['params']} {best_trial['scores']}.")
+
+        return self.results
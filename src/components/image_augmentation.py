@@ -0,0 +1,115 @@
+import math
+
+import tensorflow as tf
+
+
+# Augmentation settings shared by every data loader backend.
+ROTATION_RANGE = 40
+WIDTH_SHIFT_RANGE = 0.2
+HEIGHT_SHIFT_RANGE = 0.2
+SHEAR_RANGE = 0.2
+ZOOM_RANGE = 0.2
+HORIZONTAL_FLIP = True
+
+
+def _stack_matrix(rows: list) -> tf.Tensor:
+    """
+    Stacks nested lists of per-image scalars into a batch of matrices.
+    """
+    return tf.stack([tf.stack(row, axis=-1) for row in rows], axis=-2)
+
+
+def random_affine_transforms(seed: tf.Tensor, batch_size: tf.Tensor, height: tf.Tensor,
+                             width: tf.Tensor) -> tf.Tensor:
+    """
+    Samples one affine transform per image following the
+    semantics of keras ImageDataGenerator.apply_affine_transform:
+    rotation, shift, shear and zoom around the image center,
+    followed by an optional horizontal flip.
+
+    :param seed: stateless random seed of shape [2].
+    :param batch_size: number of transforms to sample.
+    :param height: image height in pixels.
+    :param width: image width in pixels.
+    :return: tensor of shape [batch_size, 8] for ImageProjectiveTransformV3.
+    """
+    seeds = tf.random.experimental.stateless_split(seed, num=7)
+    shape = tf.reshape(batch_size, [1])
+    height = tf.cast(height, tf.float32)
+    width = tf.cast(width, tf.float32)
+
+    def uniform(index, low, high):
+        return tf.random.stateless_uniform(shape, seed=seeds[index], minval=low, maxval=high)
+
+    theta = uniform(0, -ROTATION_RANGE, ROTATION_RANGE) * math.pi / 180
+    tx = uniform(1, -HEIGHT_SHIFT_RANGE, HEIGHT_SHIFT_RANGE) * height
+    ty = uniform(2, -WIDTH_SHIFT_RANGE, WIDTH_SHIFT_RANGE) * width
+    shear = uniform(3, -SHEAR_RANGE, SHEAR_RANGE) * math.pi / 180
+    zx = uniform(4, 1 - ZOOM_RANGE, 1 + ZOOM_RANGE)
+    zy = uniform(5, 1 - ZOOM_RANGE, 1 + ZOOM_RANGE)
+    if HORIZONTAL_FLIP:
+        flip = tf.cast(uniform(6, 0, 1) < 0.5, tf.float32)
+    else:
+        flip = tf.zeros(shape)
+
+    ones, zeros = tf.ones(shape), tf.zeros(shape)
+
+    # Matrices map output (row, col) coordinates to input coordinates.
+    rotation = _stack_matrix([[tf.cos(theta), -tf.sin(theta), zeros],
+                              [tf.sin(theta), tf.cos(theta), zeros],
+                              [zeros, zeros, ones]])
+    shift = _stack_matrix([[ones, zeros, tx],
+                           [zeros, ones, ty],
+                           [zeros, zeros, ones]])
+    shearing = _stack_matrix([[ones, -tf.sin(shear), zeros],
+                              [zeros, tf.cos(shear), zeros],
+                              [zeros, zeros, ones]])
+    zoom = _stack_matrix([[zx, zeros, zeros],
+                          [zeros, zy, zeros],
+                          [zeros, zeros, ones]])
+
+    center_row, center_col = height / 2 - 0.5, width / 2 - 0.5
+    offset = _stack_matrix([[ones, zeros, ones * center_row],
+                            [zeros, ones, ones * center_col],
+                            [zeros, zeros, ones]])
+    reset = _stack_matrix([[ones, zeros, -ones * center_row],
+                           [zeros, ones, -ones * center_col],
+                           [zeros, zeros, ones]])
+    flipping = _stack_matrix([[ones, zeros, zeros],
+                              [zeros, 1 - 2 * flip, flip * (width - 1)],
+                              [zeros, zeros, ones]])
+
+    matrix = offset @ rotation @ shift @ shearing @ zoom @ reset @ flipping
+
+    # ImageProjectiveTransformV3 expects (x, y) = (col, row) order.
+    return tf.stack([
+        matrix[:, 1, 1], matrix[:, 1, 0], matrix[:, 1, 2],
+        matrix[:, 0, 1], matrix[:, 0, 0], matrix[:, 0, 2],
+        zeros, zeros
+    ], axis=-1)
+
+
+def augment_images(images: tf.Tensor, seed: tf.Tensor) -> tf.Tensor:
+    """
+    Applies random affine augmentation to a batch of images in one
+    fused projective transform.
+
+    :param images: float or uint8 tensor of shape [batch, height, width, channels].
+    :param seed: stateless random seed of shape [2].
+    :return: augmented images of the same shape and dtype.
+    """
+    dtype = images.dtype
+    shape = tf.shape(images)
+    transforms = random_affine_transforms(seed=seed, batch_size=shape[0],
+                                          height=shape[1], width=shape[2])
+    augmented = tf.raw_ops.ImageProjectiveTransformV3(
+        images=tf.cast(images, tf.float32) if dtype == tf.uint8 else images,
+        transforms=transforms,
+        output_shape=shape[1:3],
+        fill_value=0.0,
+        interpolation="BILINEAR",
+        fill_mode="NEAREST"
+    )
+    if dtype == tf.uint8:
+        return tf.cast(tf.clip_by_value(tf.round(augmented), 0, 255), tf.uint8)
+    return augmented
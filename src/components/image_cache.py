@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from src import logger
+from src.components.image_augmentation import augment_images
+from src.components.image_loader import load_image_array
+from src.utils.utils import get_directory_fingerprint, create_directories, list_image_files
+
+
+class ImageCache:
+    """
+    Decoded images of a data split stored once as a resized
+    uint8 memory-mapped array with a labels and index file.
+    """
+
+    def __init__(self, root_dir: Path, training_data: Path, img_size: list, seed: int = None):
+        self.root_dir = Path(root_dir)
+        self.training_data = Path(training_data)
+        self.img_size = img_size
+        self.seed = seed
+
+
+    def get_cache_dir(self, split: str) -> Path:
+        height, width = self.img_size[:2]
+        return self.root_dir / f"{split}_{height}x{width}"
+
+
+    def get_fingerprint(self, split: str) -> str:
+        return f"{get_directory_fingerprint(self.training_data / split)}:{list(self.img_size)}"
+
+
+    def get_split(self, split: str) -> tuple:
+        """
+        Returns the cached images of a split, (re)building the
+        cache when the source files or image size changed.
+
+        :param split: name of the split directory (train, valid, test).
+        :return: (uint8 images memmap, class indices, class names).
+        """
+        cache_dir = self.get_cache_dir(split)
+        fingerprint = self.get_fingerprint(split)
+
+        index = None
+        if (cache_dir / "index.json").exists():
+            with open(cache_dir / "index.json") as f:
+                index = json.load(f)
+        if index is None or index["fingerprint"] != fingerprint:
+            index = self.build(split=split, fingerprint=fingerprint)
+        else:
+            logger.info(f"Using cached {split} images from {cache_dir}.")
+
+        images = np.load(cache_dir / "images.npy", mmap_mode="r")
+        labels = np.load(cache_dir / "labels.npy")
+        return images, labels, index["class_names"]
+
+
+    def _load_image(self, file_path: str) -> np.ndarray:
+        return load_image_array(file_path, target_size=tuple(self.img_size[:2]))
+
+
+    def build(self, split: str, fingerprint: str) -> dict:
+        """
+        Decodes and resizes every image of a split into the cache.
+        Samples are stored in a seeded random order so that
+        contiguous slices mix classes.
+
+        :param split: name of the split directory (train, valid, test).
+        :param fingerprint: source fingerprint recorded in the index.
+        :return: index of the cache.
+        """
+        cache_dir = self.get_cache_dir(split)
+        logger.info(f"Building {split} image cache at {cache_dir}.")
+        if cache_dir.exists():
+            shutil.rmtree(cache_dir)
+        create_directories([cache_dir])
+
+        file_paths, labels, class_names = list_image_files(self.training_data / split)
+        order = np.random.default_rng(self.seed).permutation(len(file_paths))
+        file_paths = [file_paths[i] for i in order]
+        labels = np.asarray(labels, dtype=np.int32)[order]
+
+        images = np.lib.format.open_memmap(cache_dir / "images.npy.tmp", mode="w+", dtype=np.uint8,
+                                           shape=(len(file_paths), *self.img_size[:2], 3))
+        with ThreadPoolExecutor() as executor:
+            for i, decoded in enumerate(executor.map(self._load_image, file_paths)):
+                images[i] = decoded
+        images.flush()
+        del images
+        os.replace(cache_dir / "images.npy.tmp", cache_dir / "images.npy")
+        np.save(cache_dir / "labels.npy", labels)
+
+        # index.json is written last and marks the cache as complete.
+        index = {
+            "fingerprint": fingerprint,
+            "class_names": class_names,
+            "files": [os.path.relpath(path, self.training_data / split) for path in file_paths]
+        }
+        with open(cache_dir / "index.json", "w") as f:
+            json.dump(index, f)
+        logger.info(f"Cached {len(file_paths)} {split} images.")
+
+        return index
+
+
+class CachedImageBatches(tf.keras.utils.PyDataset):
+    """
+    Serves batches of the uint8 image cache, rescaling (and optionally
+    augmenting) one batch at a time. Without shuffling, batches are
+    zero-copy slices; with shuffling, sample indices are permuted every
+    epoch and gathered in sorted order. Without rescaling, batches stay uint8.
+    """
+
+    def __init__(self, images: np.ndarray, labels: np.ndarray, n_classes: int, batch_size: int,
+                 shuffle: bool, augment: bool, rescale: bool = True, seed: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.images = images
+        self.labels = np.eye(n_classes, dtype=np.float32)[labels]
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.augment = augment
+        self.rescale = rescale
+        self.rng = np.random.default_rng(seed)
+        self.indices = np.arange(len(images))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return math.ceil(len(self.images) / self.batch_size)
+
+    def __getitem__(self, index):
+        start = index * self.batch_size
+        stop = start + self.batch_size
+        if self.shuffle:
+            # Sorted reads keep page cache access sequential within a batch.
+            batch_indices = np.sort(self.indices[start:stop])
+            batch, labels = self.images[batch_indices], self.labels[batch_indices]
+        else:
+            batch, labels = self.images[start:stop], self.labels[start:stop]
+        if self.rescale:
+            batch = batch.astype(np.float32) * (1. / 255)
+        if self.augment:
+            seed = self.rng.integers(0, np.iinfo(np.int64).max, size=2)
+            batch = augment_images(tf.constant(batch), tf.constant(seed)).numpy()
+        return batch, labels
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
@@ -0,0 +1,112 @@
+import io
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+from keras.src.legacy.preprocessing.image import DirectoryIterator
+
+
+# Scales libjpeg can decode at directly.
+JPEG_RATIOS = (1, 2, 4, 8)
+
+PIL_INTERPOLATIONS = {
+    "nearest": Image.NEAREST,
+    "bilinear": Image.BILINEAR,
+    "bicubic": Image.BICUBIC
+}
+
+
+def load_image(image_file, target_size: tuple, interpolation: str = "bilinear") -> Image.Image:
+    """
+    Decodes an image to RGB at the target size. JPEGs are decoded
+    at the smallest 1/2, 1/4 or 1/8 scale still at least as large
+    as the target, so large scans are never decoded at full size.
+
+    :param image_file: path or file-like object of the image.
+    :param target_size: (height, width) of the output.
+    :param interpolation: resize method of the final resize.
+    :return: PIL Image of size target_size.
+    """
+    if isinstance(image_file, (str, Path)):
+        with open(image_file, "rb") as f:
+            img = Image.open(io.BytesIO(f.read()))
+    else:
+        img = Image.open(image_file)
+
+    height, width = target_size
+    # No-op for formats other than JPEG.
+    img.draft("RGB", (width, height))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != (width, height):
+        img = img.resize((width, height), PIL_INTERPOLATIONS[interpolation])
+    return img
+
+
+def load_image_array(image_file, target_size: tuple, dtype: str = "uint8",
+                     interpolation: str = "bilinear") -> np.ndarray:
+    """
+    Decodes an image with load_image into an array.
+
+    :return: array of shape (height, width, 3).
+    """
+    img = load_image(image_file, target_size=target_size, interpolation=interpolation)
+    array = np.asarray(img, dtype=dtype)
+    img.close()
+    return array
+
+
+def decode_image_tensor(contents: tf.Tensor, target_size: tuple) -> tf.Tensor:
+    """
+    In-graph counterpart of load_image: decodes encoded image
+    bytes, JPEGs at a reduced scale, and resizes bilinearly.
+
+    :param contents: scalar string tensor of the encoded image.
+    :param target_size: (height, width) of the output.
+    :return: uint8 tensor of shape (height, width, 3).
+    """
+    height, width = target_size
+
+    def decode_jpeg():
+        shape = tf.cast(tf.image.extract_jpeg_shape(contents)[:2], tf.float32)
+        scale = tf.reduce_min(shape / tf.constant([height, width], tf.float32))
+        # Largest ratio whose decoded size still covers the target.
+        ratio_index = tf.reduce_sum(tf.cast(scale >= tf.constant(JPEG_RATIOS[1:], tf.float32), tf.int32))
+        return tf.switch_case(ratio_index, [
+            lambda ratio=ratio: tf.io.decode_jpeg(contents, channels=3, ratio=ratio) for ratio in JPEG_RATIOS
+        ])
+
+    def decode_other():
+        return tf.io.decode_image(contents, channels=3, expand_animations=False)
+
+    image = tf.cond(tf.io.is_jpeg(contents), decode_jpeg, decode_other)
+    image = tf.image.resize(image, (height, width), method="bilinear")
+    return tf.cast(tf.clip_by_value(tf.round(image), 0, 255), tf.uint8)
+
+
+class ScaledDirectoryIterator(DirectoryIterator):
+    """
+    flow_from_directory iterator decoding images through load_image,
+    so large JPEGs are decoded at a reduced scale.
+    """
+
+    def _get_batches_of_transformed_samples(self, index_array):
+        if self.class_mode != "categorical" or self.color_mode != "rgb" or self.save_to_dir:
+            return super()._get_batches_of_transformed_samples(index_array)
+
+        batch_x = np.zeros((len(index_array),) + self.image_shape, dtype=self.dtype)
+        filepaths = self.filepaths
+        for i, j in enumerate(index_array):
+            x = load_image_array(filepaths[j], target_size=self.target_size, dtype=self.dtype,
+                                 interpolation=self.interpolation)
+            if self.image_data_generator:
+                params = self.image_data_generator.get_random_transform(x.shape)
+                x = self.image_data_generator.apply_transform(x, params)
+                x = self.image_data_generator.standardize(x)
+            batch_x[i] = x
+
+        batch_y = np.zeros((len(batch_x), len(self.class_indices)), dtype=self.dtype)
+        for i, n_observation in enumerate(index_array):
+            batch_y[i, self.classes[n_observation]] = 1.0
+        return batch_x, batch_y
@@ -0,0 +1,225 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from src import logger
+from src.config.config_manager import ModelInferenceConfig
+from src.components.model_registry import ModelRegistry
+
+
+def get_model_input(model, images: np.ndarray) -> np.ndarray:
+    """
+    Converts uint8 images to what the model was trained on: uint8
+    for models with embedded preprocessing, rescaled float32 otherwise.
+
+    :param model: keras Model.
+    :param images: uint8 array of shape (batch, *IMAGE_SIZE).
+    :return: model input array.
+    """
+    if model.inputs[0].dtype == "uint8":
+        return images
+    return images.astype("float32") * (1. / 255)
+
+
+class TFLiteModel:
+    """
+    TFLite interpreter over a converted model, one interpreter per
+    thread since interpreters must not be shared between threads.
+    """
+
+    def __init__(self, model_path: Path, num_threads: int = None):
+        self.model_path = Path(model_path)
+        self.num_threads = num_threads
+        self._local = threading.local()
+
+
+    def get_interpreter(self) -> tf.lite.Interpreter:
+        interpreter = getattr(self._local, "interpreter", None)
+        if interpreter is None:
+            interpreter = tf.lite.Interpreter(model_path=str(self.model_path), num_threads=self.num_threads)
+            interpreter.allocate_tensors()
+            self._local.interpreter = interpreter
+        return interpreter
+
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        """
+        Runs the interpreter on a batch of uint8 images, converting
+        them to the (possibly quantized) input type of the model.
+
+        :param images: uint8 array of shape (batch, height, width, 3).
+        :return: float class probabilities.
+        """
+        interpreter = self.get_interpreter()
+        input_details = interpreter.get_input_details()[0]
+        if list(input_details["shape"]) != list(images.shape):
+            interpreter.resize_tensor_input(input_details["index"], images.shape)
+            interpreter.allocate_tensors()
+            input_details = interpreter.get_input_details()[0]
+
+        dtype = input_details["dtype"]
+        if dtype == np.uint8 and not input_details["quantization"][0]:
+            # Model with embedded preprocessing.
+            inputs = images
+        else:
+            inputs = images.astype(np.float32) * (1. / 255)
+            scale, zero_point = input_details["quantization"]
+            if scale:
+                inputs = np.round(inputs / scale + zero_point)
+                inputs = np.clip(inputs, np.iinfo(dtype).min, np.iinfo(dtype).max)
+            inputs = inputs.astype(dtype)
+
+        interpreter.set_tensor(input_details["index"], inputs)
+        interpreter.invoke()
+
+        output_details = interpreter.get_output_details()[0]
+        outputs = interpreter.get_tensor(output_details["index"])
+        scale, zero_point = output_details["quantization"]
+        if scale:
+            outputs = (outputs.astype(np.float32) - zero_point) * scale
+        return outputs
+
+
+class InferenceBackend(ABC):
+    """
+    Abstract class for the runtimes executing the trained model.
+    """
+
+    @abstractmethod
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        """
+        Runs one forward pass.
+
+        :param images: uint8 array of shape (batch, *IMAGE_SIZE).
+        :return: class probabilities per image.
+        """
+        pass
+
+
+class KerasInferenceBackend(InferenceBackend):
+    """
+    Runs the keras model held by the model registry through plain
+    model.predict, the baseline the compiled backend is compared to.
+    """
+
+    def __init__(self, registry: ModelRegistry):
+        self.registry = registry
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        model = self.registry.get_model()
+        return model.predict(get_model_input(model, images), batch_size=len(images), verbose=0)
+
+
+class CompiledInferenceBackend(InferenceBackend):
+    """
+    Runs the registry's keras model through tf.functions with a fixed
+    input signature per batch size bucket, optionally XLA compiled.
+    Every bucket is traced when a model is loaded, so requests never
+    retrace; batches are zero padded to the next bucket.
+    """
+
+    def __init__(self, config: ModelInferenceConfig, registry: ModelRegistry):
+        self.config = config
+        self.registry = registry
+        self.buckets = sorted(config.batch_buckets)
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+        # Reloaded models are traced in the registry's background thread before they are swapped in.
+        registry.add_load_hook(self.compile)
+        self.get_functions()
+
+
+    def compile(self, model: tf.keras.Model) -> dict:
+        """
+        Traces (and with jit_compile, XLA compiles) one function per bucket.
+
+        :param model: keras Model.
+        :return: {batch size: tf.function}.
+        """
+        rescale = model.inputs[0].dtype != "uint8"
+
+        def forward(images):
+            if rescale:
+                images = tf.cast(images, tf.float32) * (1. / 255)
+            return model(images, training=False)
+
+        functions = {}
+        start = time.perf_counter()
+        for bucket in self.buckets:
+            spec = tf.TensorSpec((bucket, *self.config.img_size), tf.uint8)
+            function = tf.function(forward, input_signature=[spec], jit_compile=self.config.jit_compile)
+            # Calling once also runs XLA compilation, which happens lazily on the first call.
+            function(tf.zeros(spec.shape, tf.uint8))
+            functions[bucket] = function
+        logger.info(f"Traced inference functions for batch sizes {self.buckets} "
+                    f"(jit_compile={self.config.jit_compile}) in {time.perf_counter() - start:.2f}s.")
+
+        with self._lock:
+            # Keep the functions of the model being served until the new one is swapped in.
+            served = self.registry.model
+            self._compiled = {key: entry for key, entry in self._compiled.items() if entry[0] is served}
+            self._compiled[id(model)] = (model, functions)
+        return functions
+
+
+    def get_functions(self) -> dict:
+        model = self.registry.get_model()
+        entry = self._compiled.get(id(model))
+        if entry is None or entry[0] is not model:
+            return self.compile(model)
+        return entry[1]
+
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        functions = self.get_functions()
+        outputs = []
+        for start in range(0, len(images), self.buckets[-1]):
+            chunk = images[start:start + self.buckets[-1]]
+            bucket = next(bucket for bucket in self.buckets if bucket >= len(chunk))
+            if bucket != len(chunk):
+                padding = np.zeros((bucket - len(chunk), *chunk.shape[1:]), dtype=chunk.dtype)
+                chunk = np.concatenate([chunk, padding])
+            outputs.append(functions[bucket](tf.constant(chunk, tf.uint8)).numpy()[:len(images) - start])
+        return np.concatenate(outputs)
+
+
+class TFLiteInferenceBackend(InferenceBackend):
+    """
+    Runs a TFLite export of the trained model.
+    """
+
+    def __init__(self, config: ModelInferenceConfig):
+        logger.info(f"Loading TFLite inference model from {config.tflite_model_path}.")
+        self.model = TFLiteModel(model_path=config.tflite_model_path)
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        return self.model.predict(images)
+
+
+class InferenceBackendFactory:
+    """
+    Factory class to get the configured inference backend.
+    """
+
+    @staticmethod
+    def get_inference_backend(config: ModelInferenceConfig, registry: ModelRegistry) -> InferenceBackend:
+        """
+        Factory method to select inference backend based on config.
+
+        :param config: inference configuration.
+        :param registry: registry holding the keras model.
+        :return: An instance of an InferenceBackend class.
+        """
+        if config.backend == "keras":
+            return KerasInferenceBackend(registry)
+        elif config.backend == "compiled":
+            return CompiledInferenceBackend(config, registry)
+        elif config.backend == "tflite":
+            return TFLiteInferenceBackend(config)
+        else:
+            raise ValueError(f"Unsupported inference backend: {config.backend}")
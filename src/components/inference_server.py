@@ -0,0 +1,272 @@
+import asyncio
+import io
+import json
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from src import logger
+from src.config.config_manager import ModelServingConfig
+from src.components.model_predictor import ModelPredictor, CLASS_LABELS
+
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+
+class MicroBatcher:
+    """
+    Collects queued requests into micro-batches bounded by
+    max batch size and max wait time and runs one forward
+    pass per batch on a pool of worker threads.
+    """
+
+    def __init__(self, predictor: ModelPredictor, config: ModelServingConfig):
+        self.predictor = predictor
+        self.config = config
+        self.queue = None
+        self.executor = ThreadPoolExecutor(max_workers=config.workers,
+                                           thread_name_prefix="inference-worker")
+        self._tasks = []
+
+
+    async def start(self):
+        """
+        Starts one batching loop per worker thread.
+        """
+        self.queue = asyncio.Queue(maxsize=self.config.max_queue_size)
+        self._tasks = [asyncio.create_task(self._batch_loop()) for _ in range(self.config.workers)]
+
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+
+
+    def submit(self, image: np.ndarray) -> asyncio.Future:
+        """
+        Enqueues a decoded image without waiting.
+
+        :param image: array of shape IMAGE_SIZE.
+        :return: future resolved with the predicted class index.
+        :raises asyncio.QueueFull: when the backpressure limit is reached.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((image, future))
+        return future
+
+
+    async def _collect_batch(self) -> list:
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.max_wait_ms / 1000
+
+        while len(batch) < self.config.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+
+    def _run_batch(self, images: list) -> np.ndarray:
+        # Pad to the next power of two so the model only sees a few batch shapes.
+        padded_size = min(1 << (len(images) - 1).bit_length(), self.config.max_batch_size)
+        batch = np.zeros((max(padded_size, len(images)), *images[0].shape), dtype=images[0].dtype)
+        batch[:len(images)] = images
+        return self.predictor.predict_arrays(batch)[:len(images)]
+
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            batch = [(image, future) for image, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            try:
+                classes = await loop.run_in_executor(self.executor, self._run_batch,
+                                                     [image for image, _ in batch])
+            except Exception as e:
+                logger.info(f"Error occurred while running inference batch: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), class_index in zip(batch, classes):
+                if not future.done():
+                    future.set_result(int(class_index))
+
+
+class InferenceServer:
+    """
+    Local HTTP endpoint in front of the micro-batcher.
+
+    POST /predict with the raw image bytes as body returns
+    [{"state": ...}], GET /health reports queue and latency stats.
+    """
+
+    def __init__(self, config: ModelServingConfig, predictor: ModelPredictor):
+        self.config = config
+        self.predictor = predictor
+        self.batcher = MicroBatcher(predictor=predictor, config=config)
+        self.latencies = deque(maxlen=1000)
+
+
+    async def serve_forever(self):
+        await self.batcher.start()
+        server = await asyncio.start_server(self._handle_connection,
+                                            host=self.config.host,
+                                            port=self.config.port)
+        logger.info(f"Inference server listening on http://{self.config.host}:{self.config.port}.")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+    def get_stats(self) -> dict:
+        """
+        Summarizes recent request latencies in milliseconds.
+        """
+        stats = {"queue_size": self.batcher.queue.qsize() if self.batcher.queue else 0}
+        if self.latencies:
+            latencies = np.array(self.latencies) * 1000
+            stats.update({
+                "latency_p50_ms": float(np.percentile(latencies, 50)),
+                "latency_p99_ms": float(np.percentile(latencies, 99))
+            })
+        return stats
+
+
+    async def predict(self, body: bytes) -> tuple:
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            test_image = await loop.run_in_executor(None, self.predictor.load_image, io.BytesIO(body))
+        except Exception as e:
+            return 400, {"error": f"Could not decode image: {e}"}
+
+        try:
+            future = self.batcher.submit(test_image)
+        except asyncio.QueueFull:
+            return 503, {"error": "Server is overloaded, retry later."}
+
+        try:
+            class_index = await future
+        except Exception as e:
+            return 500, {"error": f"Inference failed: {e}"}
+        self.latencies.append(time.perf_counter() - start)
+        return 200, [{"state": CLASS_LABELS.get(class_index, CLASS_LABELS[0])}]
+
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple:
+        if path == "/predict":
+            if method != "POST":
+                return 405, {"error": "Use POST."}
+            return await self.predict(body)
+        if path == "/health":
+            return 200, {"status": "ok", **self.get_stats()}
+        return 404, {"error": f"Unknown path {path}."}
+
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                content_length = int(headers.get("content-length", 0))
+                if content_length > self.config.max_body_mb * 1024 * 1024:
+                    status, payload = 413, {"error": "Image is too large."}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(content_length) if content_length else b""
+                    try:
+                        status, payload = await self._route(method, path, body)
+                    except Exception as e:
+                        logger.info(f"Error occurred while handling {method} {path}: {e}")
+                        status, payload = 500, {"error": f"Internal error: {e}"}
+                    keep_alive = headers.get("connection", "").lower() != "close"
+
+                response = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(response)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + response
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+class InferenceClient:
+    """
+    Thin client of the InferenceServer.
+    """
+
+    def __init__(self, server_url: str, timeout: float = 30):
+        self.server_url = server_url.rstrip("/")
+        self.timeout = timeout
+
+
+    def predict(self, image_file) -> list:
+        """
+        Sends an image to the server for prediction.
+
+        :param image_file: path or file-like object of the image.
+        :return: [{"state": ...}] as returned by predict().
+        """
+        if isinstance(image_file, (str, Path)):
+            body = Path(image_file).read_bytes()
+        elif hasattr(image_file, "getvalue"):
+            body = image_file.getvalue()
+        else:
+            body = image_file.read()
+
+        request = urllib.request.Request(
+            url=f"{self.server_url}/predict",
+            data=body,
+            method="POST",
+            headers={"Content-Type": "application/octet-stream"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise ValueError(f"Inference server returned {e.code}: {e.read().decode()}")
@@ -2,7 +2,10 @@ import tensorflow as tf
 
 from src import logger
 from src.components.data_preprocessor import DataPreprocessor
-from src.config.config_manager import ModelEvaluationConfig, DataPreprocessingConfig
+from src.components.feature_cache import FeatureCache, FeatureBatches, build_head_model
+from src.config.config_manager import ModelEvaluationConfig, DataPreprocessingConfig, FeatureCacheConfig
+from src.components.artifact_context import ArtifactContext
+from src.components.profiler import profile
 from pathlib import Path
 
 
@@ -12,12 +15,21 @@ class ModelEvaluator:
     Evaluates the trained model on test dataset.
     """
 
-    def __init__(self, eval_config: ModelEvaluationConfig, preprocessing_config: DataPreprocessingConfig):
+    def __init__(self, eval_config: ModelEvaluationConfig, preprocessing_config: DataPreprocessingConfig,
+                 feature_cache_config: FeatureCacheConfig = None, context: ArtifactContext = None):
         self.score = None
         self.config = eval_config
-        self.data_preprocessor = DataPreprocessor(config=preprocessing_config)
+        self.context = context
+        self.data_preprocessor = None
+        if context is not None:
+            self.data_preprocessor = context.get("data_preprocessor")
+        if self.data_preprocessor is None:
+            self.data_preprocessor = DataPreprocessor(config=preprocessing_config)
         self.model = None
         self.test_generator = None
+        self.feature_cache = None
+        if feature_cache_config is not None and feature_cache_config.enabled:
+            self.feature_cache = FeatureCache(config=feature_cache_config)
 
 
     def get_score(self):
@@ -54,8 +66,24 @@ class ModelEvaluator:
             raise ValueError("Test data has not been preprocessed. Call preprocess_test_data() before evaluation.")
 
         logger.info("Starting model evaluation on test data.")
-        self.model = self.load_model(self.config.model_path)
-        self.score = self.model.evaluate(self.test_generator)
+        if self.context is not None and self.context.get("trained_model") is not None:
+            logger.info("Using the trained model handed over in memory.")
+            self.model = self.context.get("trained_model")
+        else:
+            self.model = self.load_model(self.config.model_path)
+        if self.feature_cache is not None:
+            test_features, test_labels = self.feature_cache.get_features(
+                split="test", model=self.model, data=self.test_generator
+            )
+            head_model = build_head_model(model=self.model, feature_shape=test_features.shape[1:])
+            with profile("model.evaluate"):
+                self.score = head_model.evaluate(
+                    FeatureBatches(test_features, test_labels,
+                                   batch_size=self.data_preprocessor.config.batch_size, shuffle=False)
+                )
+        else:
+            with profile("model.evaluate"):
+                self.score = self.model.evaluate(self.test_generator)
 
         scores = {"test_loss": self.score[0], "test_accuracy": self.score[1]}
         logger.info(f"Model Scores: {scores}.")
@@ -0,0 +1,73 @@
+import tensorflow as tf
+from abc import ABC, abstractmethod
+
+
+class FeatureReduction(ABC):
+    """
+    Abstract base class that defines the strategy interface
+    for reducing backbone feature maps to a feature vector.
+    """
+
+    @abstractmethod
+    def get_layer(self, name: str) -> tf.keras.layers.Layer:
+        """
+        Abstract method to create the reduction layer.
+
+        :param name: name of the layer.
+        :return: an instance of a keras Layer.
+        """
+        pass
+
+
+class FlattenReduction(FeatureReduction):
+    """
+    Concrete strategy keeping every spatial position,
+    e.g. 7x7x512 = 25,088 features for VGG16 at 224x224.
+    """
+
+    def get_layer(self, name: str) -> tf.keras.layers.Flatten:
+        return tf.keras.layers.Flatten(name=name)
+
+
+class GlobalAveragePoolingReduction(FeatureReduction):
+    """
+    Concrete strategy averaging each channel over the
+    feature map, independent of the input resolution.
+    """
+
+    def get_layer(self, name: str) -> tf.keras.layers.GlobalAveragePooling2D:
+        return tf.keras.layers.GlobalAveragePooling2D(name=name)
+
+
+class GlobalMaxPoolingReduction(FeatureReduction):
+    """
+    Concrete strategy taking the maximum of each channel over
+    the feature map, independent of the input resolution.
+    """
+
+    def get_layer(self, name: str) -> tf.keras.layers.GlobalMaxPooling2D:
+        return tf.keras.layers.GlobalMaxPooling2D(name=name)
+
+
+class FeatureReductionFactory:
+    """
+    Factory class to get the feature reduction
+    of the classification head.
+    """
+
+    @staticmethod
+    def get_feature_reduction(head_type: str) -> FeatureReduction:
+        """
+        Returns the feature reduction for the specified head type.
+
+        :param head_type: supported choices are "flatten", "avg_pooling" and "max_pooling".
+        :return: An instance of FeatureReduction.
+        """
+        if head_type == "flatten":
+            return FlattenReduction()
+        elif head_type == "avg_pooling":
+            return GlobalAveragePoolingReduction()
+        elif head_type == "max_pooling":
+            return GlobalMaxPoolingReduction()
+        else:
+            raise ValueError(f"Head type {head_type} is not supported.")
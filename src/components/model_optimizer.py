@@ -9,12 +9,16 @@ class ModelOptimizer(ABC):
     """
 
     @abstractmethod
-    def get_optimizer(self, learning_rate: float) ->  tf.keras.optimizers.Optimizer:
+    def get_optimizer(self, learning_rate: float,
+                      gradient_accumulation_steps: int = None) ->  tf.keras.optimizers.Optimizer:
         """
         Abstract method to initialize the tf keras
         optimizer with the specified learning rate.
 
         :param learning_rate: learning rate for the optimizer
+        :param gradient_accumulation_steps: number of micro-batches whose
+                                            averaged gradients make one update,
+                                            None to update on every batch.
         :return: an instance of keras optimizer.
         """
         pass
@@ -24,45 +28,54 @@ class SGDOptimizer(ModelOptimizer):
     """
     Concrete strategy implementation for SGD Optimizer.
     """
-    def get_optimizer(self, learning_rate: float) -> tf.keras.optimizers.SGD:
+    def get_optimizer(self, learning_rate: float,
+                      gradient_accumulation_steps: int = None) -> tf.keras.optimizers.SGD:
         """
         Initializes the tf keras SGD optimizer
         with the specified learning rate.
 
         :param learning_rate: learning rate for the optimizer
+        :param gradient_accumulation_steps: micro-batches per update.
         :return: an instance of keras SGD optimizer.
         """
-        return tf.keras.optimizers.SGD(learning_rate=learning_rate)
+        return tf.keras.optimizers.SGD(learning_rate=learning_rate,
+                                       gradient_accumulation_steps=gradient_accumulation_steps)
 
 
 class AdamOptimizer(ModelOptimizer):
     """
     Concrete strategy implementation for Adam Optimizer.
     """
-    def get_optimizer(self, learning_rate: float) -> tf.keras.optimizers.Adam:
+    def get_optimizer(self, learning_rate: float,
+                      gradient_accumulation_steps: int = None) -> tf.keras.optimizers.Adam:
         """
         Initializes the tf keras Adam optimizer
         with the specified learning rate.
 
         :param learning_rate: learning rate for the optimizer
+        :param gradient_accumulation_steps: micro-batches per update.
         :return: an instance of keras Adam optimizer.
         """
-        return tf.keras.optimizers.Adam(learning_rate=learning_rate)
+        return tf.keras.optimizers.Adam(learning_rate=learning_rate,
+                                        gradient_accumulation_steps=gradient_accumulation_steps)
 
 
 class RMSPropOptimizer(ModelOptimizer):
     """
     Concrete strategy implementation for RMSProp Optimizer.
     """
-    def get_optimizer(self, learning_rate: float) -> tf.keras.optimizers.RMSprop:
+    def get_optimizer(self, learning_rate: float,
+                      gradient_accumulation_steps: int = None) -> tf.keras.optimizers.RMSprop:
         """
         Initializes the tf keras RMSProp optimizer
         with the specified learning rate.
 
         :param learning_rate: learning rate for the optimizer
+        :param gradient_accumulation_steps: micro-batches per update.
         :return: an instance of keras RMSProp optimizer.
         """
-        return tf.keras.optimizers.RMSprop(learning_rate=learning_rate)
+        return tf.keras.optimizers.RMSprop(learning_rate=learning_rate,
+                                           gradient_accumulation_steps=gradient_accumulation_steps)
 
 
 class ModelOptimizerFactory:
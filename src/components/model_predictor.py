@@ -0,0 +1,102 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from src.config.config_manager import ModelInferenceConfig
+from src.components.image_loader import load_image_array
+from src.components.inference_backend import InferenceBackendFactory
+from src.components.model_registry import ModelRegistry
+
+
+CLASS_LABELS = {
+    0: "Adenocarcinoma Cancer",
+    1: "Normal"
+}
+
+
+class ModelPredictor:
+    """
+    Runs the registered model over single images,
+    fixed-size batches or streams of images.
+    """
+
+    def __init__(self, config: ModelInferenceConfig, registry: ModelRegistry):
+        self.config = config
+        self.registry = registry
+        self.backend = InferenceBackendFactory.get_inference_backend(config=config, registry=registry)
+
+
+    def load_image(self, image_file) -> np.ndarray:
+        """
+        Decodes and resizes an image to the model input size,
+        with the same decoding and interpolation as training.
+
+        :param image_file: path or file-like object of the image.
+        :return: uint8 array of shape IMAGE_SIZE.
+        """
+        return load_image_array(image_file, target_size=tuple(self.config.img_size[:-1]))
+
+
+    def predict_arrays(self, images: np.ndarray) -> np.ndarray:
+        """
+        Runs one forward pass over a stacked batch of images.
+
+        :param images: uint8 array of shape (batch, *IMAGE_SIZE).
+        :return: predicted class index per image.
+        """
+        return np.argmax(self.backend.predict(images), axis=1)
+
+
+    def predict_stream(self, image_files: Iterable, batch_size: int = None) -> Iterator[dict]:
+        """
+        Decodes images in parallel, groups them into fixed-size
+        batches and yields per-image results as each batch finishes.
+        The next batch is decoded while the current one is predicted.
+
+        :param image_files: iterable of paths or file-like objects.
+        :param batch_size: number of images per forward pass.
+        :return: generator of {"image", "state"} results in input order.
+        """
+        batch_size = batch_size or self.config.batch_size
+        files = iter(image_files)
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.config.decode_workers) as executor:
+
+            def fill_pending():
+                while len(pending) < 2 * batch_size:
+                    try:
+                        image_file = next(files)
+                    except StopIteration:
+                        return
+                    pending.append((image_file, executor.submit(self.load_image, image_file)))
+
+            fill_pending()
+            while pending:
+                batch = [pending.popleft() for _ in range(min(batch_size, len(pending)))]
+                fill_pending()
+
+                # Pad the trailing batch so every forward pass has the same shape.
+                images = np.zeros((batch_size, *self.config.img_size), dtype="uint8")
+                for i, (_, future) in enumerate(batch):
+                    images[i] = future.result()
+
+                classes = self.predict_arrays(images)[:len(batch)]
+                for (image_file, _), class_index in zip(batch, classes):
+                    yield {
+                        "image": getattr(image_file, "name", str(image_file)),
+                        "state": CLASS_LABELS.get(int(class_index), CLASS_LABELS[0])
+                    }
+
+
+    def predict_batch(self, image_files: Iterable, batch_size: int = None) -> list:
+        """
+        Collects predict_stream results into a list.
+
+        :param image_files: iterable of paths or file-like objects.
+        :param batch_size: number of images per forward pass.
+        :return: list of {"image", "state"} results in input order.
+        """
+        return list(self.predict_stream(image_files, batch_size=batch_size))
@@ -0,0 +1,150 @@
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import tensorflow as tf
+
+from src import logger
+from src.config.config_manager import ModelInferenceConfig
+from src.utils.utils import get_file_hash
+
+
+class ModelRegistry:
+    """
+    Keeps a trained keras Model loaded for the lifetime
+    of the process and reloads it when the file on disk changes.
+    """
+
+    def __init__(self, config: ModelInferenceConfig):
+        self.config = config
+        self.model = None
+        self.signature = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher = None
+        self._load_hooks = []
+
+
+    def add_load_hook(self, hook):
+        """
+        Registers a callable run on every newly loaded model before
+        it is served, e.g. to trace inference functions for it.
+
+        :param hook: callable taking the keras Model.
+        """
+        self._load_hooks.append(hook)
+
+
+    def get_model(self) -> tf.keras.Model:
+        """
+        Returns the loaded model, loading it on first use.
+        Concurrent callers block on a single load.
+
+        :return: warmed up keras Model instance.
+        """
+        model = self.model
+        if model is not None:
+            return model
+
+        with self._lock:
+            if self.model is None:
+                self.signature = self._get_signature(self.config.model_path)
+                self.model = self.load_model(self.config.model_path)
+                self._start_watcher()
+        return self.model
+
+
+    def load_model(self, path: Path) -> tf.keras.Model:
+        """
+        Loads keras Model from specified location and runs
+        a dummy forward pass so the first request is not
+        paying for graph tracing.
+
+        :param path: filepath to saved model.
+        :return: keras Model instance.
+        """
+        logger.info(f"Loading inference model from {path}.")
+        model = tf.keras.models.load_model(path)
+        dummy_input = np.zeros((1, *self.config.img_size), dtype="uint8")
+        model.predict(dummy_input, verbose=0)
+        for hook in self._load_hooks:
+            hook(model)
+        logger.info(f"Inference model loaded and warmed up.")
+        return model
+
+
+    def stop(self):
+        """
+        Stops the background reload watcher.
+        """
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+
+    @staticmethod
+    def _get_signature(path: Path) -> dict:
+        stat = os.stat(path)
+        return {
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": get_file_hash(path)
+        }
+
+
+    def _start_watcher(self):
+        if self._watcher is not None or not self.config.reload_interval:
+            return
+        self._watcher = threading.Thread(
+            target=self._watch,
+            name="model-registry-watcher",
+            daemon=True
+        )
+        self._watcher.start()
+
+
+    def _watch(self):
+        while not self._stop_event.wait(self.config.reload_interval):
+            try:
+                self._reload_if_changed()
+            except Exception as e:
+                logger.info(f"Error occurred while reloading inference model: {e}")
+
+
+    def _reload_if_changed(self):
+        path = self.config.model_path
+        stat = os.stat(path)
+        if stat.st_mtime_ns == self.signature["mtime"] and stat.st_size == self.signature["size"]:
+            return
+
+        signature = self._get_signature(path)
+        if signature["hash"] == self.signature["hash"]:
+            # Touched but not modified, only remember the new timestamp.
+            self.signature = signature
+            return
+
+        logger.info(f"Model file {path} changed, reloading in background.")
+        model = self.load_model(path)
+        with self._lock:
+            self.model = model
+            self.signature = signature
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_model_registry(config: ModelInferenceConfig) -> ModelRegistry:
+    """
+    Provides the process wide registry for the configured model path.
+
+    :param config: inference configuration.
+    :return: shared ModelRegistry instance.
+    """
+    key = os.path.abspath(config.model_path)
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = ModelRegistry(config=config)
+        return _registries[key]
@@ -1,19 +1,49 @@
+import dataclasses
 from pathlib import Path
 from src import logger
 
 import tensorflow as tf
-from src.config.config_manager import ModelTrainingConfig, DataPreprocessingConfig
+from src.config.config_manager import ModelTrainingConfig, DataPreprocessingConfig, FeatureCacheConfig
+from src.components.artifact_context import ArtifactContext
+from src.components.base_model import snapshot_model
+from src.components.data_loader import get_steps, limit_batches
 from src.components.data_preprocessor import DataPreprocessor
+from src.components.distribution import is_chief
+from src.components.feature_cache import FeatureCache, FeatureBatches, build_head_model
+from src.components.profiler import profile
+
+
+def merge_histories(history, next_history):
+    """
+    Appends the epochs of a later fit call to an earlier History.
+
+    :return: keras History covering both fit calls.
+    """
+    if history is None:
+        return next_history
+    history.epoch += next_history.epoch
+    for key, values in next_history.history.items():
+        history.history.setdefault(key, []).extend(values)
+    return history
 
 
 class ModelTrainer:
-    def __init__(self, train_config: ModelTrainingConfig, preprocessing_config: DataPreprocessingConfig):
+    def __init__(self, train_config: ModelTrainingConfig, preprocessing_config: DataPreprocessingConfig,
+                 feature_cache_config: FeatureCacheConfig = None, context: ArtifactContext = None,
+                 strategy: tf.distribute.Strategy = None):
         logger.info(f"Model trainer initiated.")
         self.config = train_config
+        self.context = context
+        self.strategy = strategy
         self.model = None
         self.train_generator = None
         self.validation_generator = None
         self.data_preprocessor = DataPreprocessor(config=preprocessing_config)
+        if context is not None:
+            context.put("data_preprocessor", self.data_preprocessor)
+        self.feature_cache = None
+        if feature_cache_config is not None and feature_cache_config.enabled:
+            self.feature_cache = FeatureCache(config=feature_cache_config)
 
     def get_model(self):
         """
@@ -23,7 +53,29 @@ class ModelTrainer:
         """
         return self.model
 
+    def set_model(self, model: tf.keras.Model):
+        """
+        Trains a model built by the caller, e.g. under a distribution strategy.
+
+        :param model: compiled keras Model.
+        """
+        self.model = model
+
+    def load_model(self, path: Path):
+        """
+        Loads a (partially) trained model to continue training from.
+
+        :param path: filepath to saved model.
+        """
+        logger.info(f"Loading model from {path}.")
+        self.model = tf.keras.models.load_model(path)
+
     def get_base_model(self):
+        if self.context is not None and self.context.get("updated_base_model") is not None:
+            logger.info(f"Using the updated base model handed over in memory.")
+            self.model = self.context.get("updated_base_model")
+            return
+
         logger.info(f"Loading base model from {self.config.base_model_path}.")
         self.model = tf.keras.models.load_model(
             self.config.base_model_path
@@ -36,25 +88,150 @@ class ModelTrainer:
     @staticmethod
     def save_model(path: Path, model: tf.keras.Model):
         logger.info(f"Saving the trained model to {path}.")
-        model.save(path)
+        with profile("model.save"):
+            model.save(path)
+
+    def persist_model(self):
+        """
+        Hands the trained model to later steps and saves a
+        snapshot of it in background, so evaluation and export
+        can use the live model during the write. Saves
+        synchronously without a context.
+        Only the chief of a distributed cluster saves.
+        """
+        if not is_chief(self.strategy):
+            return
+        if self.context is not None:
+            snapshot = snapshot_model(self.model)
+            self.context.put("trained_model", self.model, path=self.config.trained_model_path,
+                             save=lambda path: self.save_model(path=path, model=snapshot))
+        else:
+            self.save_model(path=self.config.trained_model_path, model=self.model)
+
 
+    def train(self, epochs: int = None, initial_epoch: int = 0, data_fraction: float = 1.0,
+              callbacks: list = None):
+        """
+        Fits the model and persists it.
 
-    def train(self):
+        :param epochs: epoch to train until, defaults to EPOCHS.
+        :param initial_epoch: epoch to resume from.
+        :param data_fraction: share of training batches used per epoch.
+        :param callbacks: additional keras callbacks.
+        :return: keras History.
+        """
         if self.train_generator is None or self.validation_generator is None:
             raise ValueError("Data has not been preprocessed. Call preprocess_data() before training.")
 
-        steps_per_epoch = self.train_generator.samples // self.train_generator.batch_size
-        validation_steps = self.validation_generator.samples // self.validation_generator.batch_size
+        epochs = epochs or self.config.n_epochs
+        if self.feature_cache is not None:
+            if self.config.resize_schedule:
+                raise ValueError("RESIZE_SCHEDULE cannot be combined with CACHE_FEATURES, "
+                                 "features are cached at IMAGE_SIZE.")
+            return self.train_on_features(epochs=epochs, initial_epoch=initial_epoch, data_fraction=data_fraction,
+                                          callbacks=callbacks)
+
+        history = None
+        for img_size, start, end in self.get_resize_phases(initial_epoch=initial_epoch, epochs=epochs):
+            train_generator, validation_generator = self.get_phase_data(img_size)
+            train_data, steps_per_epoch = limit_batches(train_generator, data_fraction)
+            validation_steps = get_steps(validation_generator)
+
+            logger.info(f"Model training started with Epochs={end} at {img_size[0]}x{img_size[1]}"
+                        f"{f' from epoch {start}' if start else ''}.")
+            with profile("model.fit"):
+                phase_history = self.model.fit(
+                    train_data,
+                    epochs=end,
+                    initial_epoch=start,
+                    steps_per_epoch=steps_per_epoch,
+                    validation_steps=validation_steps,
+                    validation_data=validation_generator,
+                    callbacks=callbacks
+                )
+            history = merge_histories(history, phase_history)
+
+        self.persist_model()
+
+        return history
 
-        logger.info(f"Model training started with Epochs={self.config.n_epochs}.")
-        history = self.model.fit(
-            self.train_generator,
-            epochs=self.config.n_epochs,
-            steps_per_epoch=steps_per_epoch,
-            validation_steps=validation_steps,
-            validation_data=self.validation_generator
+
+    def get_n_fits(self, initial_epoch: int = 0, epochs: int = None) -> int:
+        """
+        Number of fit calls train() makes, one per resize phase.
+        """
+        if self.feature_cache is not None:
+            return 1
+        return len(self.get_resize_phases(initial_epoch=initial_epoch, epochs=epochs or self.config.n_epochs))
+
+
+    def get_resize_phases(self, initial_epoch: int, epochs: int) -> list:
+        """
+        Splits the epochs to train into the phases of RESIZE_SCHEDULE,
+        e.g. [[128, 2], [160, 2]] trains epochs 0-1 at 128x128, 2-3 at
+        160x160 and the remaining epochs at IMAGE_SIZE.
+
+        :return: list of (image size, first epoch, end epoch).
+        """
+        scheduled_epochs = sum(n_epochs for _, n_epochs in self.config.resize_schedule)
+        if self.config.resize_schedule and scheduled_epochs >= epochs:
+            raise ValueError(f"RESIZE_SCHEDULE covers {scheduled_epochs} epochs, training until epoch {epochs} "
+                             f"leaves none at IMAGE_SIZE.")
+
+        phases, phase_start = [], 0
+        for side, n_epochs in self.config.resize_schedule:
+            phases.append(([side, side, self.config.img_size[-1]], phase_start, phase_start + n_epochs))
+            phase_start += n_epochs
+        phases.append((list(self.config.img_size), phase_start, epochs))
+
+        return [(img_size, max(start, initial_epoch), min(end, epochs))
+                for img_size, start, end in phases if min(end, epochs) > max(start, initial_epoch)]
+
+
+    def get_phase_data(self, img_size: list) -> tuple:
+        """
+        Training and validation data at the image size of a resize phase.
+        """
+        if list(img_size) == list(self.config.img_size):
+            return self.train_generator, self.validation_generator
+        data_preprocessor = DataPreprocessor(
+            config=dataclasses.replace(self.data_preprocessor.config, img_size=img_size)
         )
+        return data_preprocessor.preprocess_data()
+
+
+    def train_on_features(self, epochs: int, initial_epoch: int = 0, data_fraction: float = 1.0,
+                          callbacks: list = None):
+        """
+        Trains only the classification head on cached backbone
+        features. The head layers are shared with the full model,
+        so the saved model carries the trained weights.
+        """
+        train_features, train_labels = self.feature_cache.get_features(
+            split="train", model=self.model, data=self.train_generator
+        )
+        valid_features, valid_labels = self.feature_cache.get_features(
+            split="valid", model=self.model, data=self.validation_generator
+        )
+        head_model = build_head_model(model=self.model, feature_shape=train_features.shape[1:])
+        train_data, steps_per_epoch = limit_batches(
+            FeatureBatches(train_features, train_labels, batch_size=self.config.batch_size, shuffle=True,
+                           seed=self.data_preprocessor.config.seed),
+            data_fraction
+        )
+
+        logger.info(f"Head training on cached features started with Epochs={epochs}.")
+        with profile("model.fit"):
+            history = head_model.fit(
+                train_data,
+                epochs=epochs,
+                initial_epoch=initial_epoch,
+                steps_per_epoch=steps_per_epoch,
+                validation_data=FeatureBatches(valid_features, valid_labels,
+                                               batch_size=self.config.batch_size, shuffle=False),
+                callbacks=callbacks
+            )
 
-        self.save_model(path=self.config.trained_model_path, model=self.model)
+        self.persist_model()
 
-        return history
\ No newline at end of file
+        return history
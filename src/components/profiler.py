@@ -0,0 +1,287 @@
+import os
+import re
+import threading
+import time
+from contextlib import ContextDecorator
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from src import logger
+
+
+SAMPLE_INTERVAL = 0.05
+
+
+def get_rss_bytes() -> int:
+    """
+    Current resident set size of the process, falling back to
+    the lifetime peak where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        if resource is None:
+            return 0
+        # ru_maxrss is in kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def get_io_counters() -> dict:
+    """
+    I/O counters of the process: bytes passed through read/write
+    calls (page cache included) and bytes fetched from/sent to storage.
+    """
+    counters = {}
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                name, value = line.split(":")
+                counters[name] = int(value)
+    except OSError:
+        pass
+    return {
+        "io_read_bytes": counters.get("rchar", 0),
+        "io_write_bytes": counters.get("wchar", 0),
+        "disk_read_bytes": counters.get("read_bytes", 0),
+        "disk_write_bytes": counters.get("write_bytes", 0)
+    }
+
+
+def get_slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+class Profiler:
+    """
+    Collects wall time, CPU time, peak RSS and I/O bytes of
+    profiled sections. Peak RSS is sampled by one background
+    thread while any section is open.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._open_frames = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sampler = None
+
+
+    def _sample(self):
+        while True:
+            rss = get_rss_bytes()
+            with self._lock:
+                if not self._open_frames:
+                    self._sampler = None
+                    return
+                for frame in self._open_frames:
+                    frame["peak_rss"] = max(frame["peak_rss"], rss)
+            time.sleep(SAMPLE_INTERVAL)
+
+
+    def start(self, name: str) -> dict:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        path = "/".join([frame["name"] for frame in stack] + [name])
+        rss = get_rss_bytes()
+        frame = {
+            "name": name,
+            "path": path,
+            "wall_start": time.perf_counter(),
+            # Process CPU time, so threads spawned by the section (tf.data, decoders) are included.
+            "cpu_start": time.process_time(),
+            "io_start": get_io_counters(),
+            "peak_rss": rss
+        }
+        stack.append(frame)
+        with self._lock:
+            self._open_frames.append(frame)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+                self._sampler.start()
+        return frame
+
+
+    def stop(self, frame: dict) -> dict:
+        wall_time = time.perf_counter() - frame["wall_start"]
+        cpu_time = time.process_time() - frame["cpu_start"]
+        io_end = get_io_counters()
+        rss = get_rss_bytes()
+        with self._lock:
+            self._open_frames.remove(frame)
+            peak_rss = max(frame["peak_rss"], rss)
+        self._local.stack.remove(frame)
+
+        record = {
+            "name": frame["name"],
+            "path": frame["path"],
+            "wall_time_s": wall_time,
+            "cpu_time_s": cpu_time,
+            "peak_rss_mb": peak_rss / 1024 ** 2,
+            **{key: io_end[key] - frame["io_start"][key] for key in io_end}
+        }
+        with self._lock:
+            self.records.append(record)
+        logger.info(f"Profiled {record['path']}: wall {wall_time:.2f}s, cpu {cpu_time:.2f}s, "
+                    f"peak rss {record['peak_rss_mb']:.0f}MB.")
+        return record
+
+
+    def log_to_mlflow(self, artifact_file: str = "profile.json", clear: bool = True):
+        """
+        Logs every record as MLflow metrics named profile.<path>.<measure>
+        (repeated sections use the step index) and all records as a JSON artifact.
+
+        :param artifact_file: name of the JSON artifact.
+        :param clear: drops the logged records.
+        """
+        import mlflow
+
+        with self._lock:
+            records = list(self.records)
+            if clear:
+                self.records = []
+        if not records:
+            return
+
+        occurrences = {}
+        for record in records:
+            prefix = "profile." + ".".join(get_slug(part) for part in record["path"].split("/"))
+            step = occurrences.get(prefix, 0)
+            occurrences[prefix] = step + 1
+            mlflow.log_metrics({f"{prefix}.{key}": value for key, value in record.items()
+                                if key not in ("name", "path")}, step=step)
+        mlflow.log_dict({"records": records}, artifact_file)
+
+
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    """
+    Returns the process-wide profiler.
+    """
+    return _profiler
+
+
+class profile(ContextDecorator):
+    """
+    Profiles a block or a function into the process-wide profiler:
+
+        with profile("model.fit"): ...
+
+        @profile(STAGE_NAME)
+        def step(...): ...
+
+    Sections nest, a record's path names its enclosing sections.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._frames = threading.local()
+
+
+    def __enter__(self):
+        frames = getattr(self._frames, "stack", None)
+        if frames is None:
+            frames = self._frames.stack = []
+        frames.append(_profiler.start(self.name))
+        return self
+
+
+    def __exit__(self, *exc):
+        _profiler.stop(self._frames.stack.pop())
+        return False
+
+
+def get_trace_callback(trace_dir: Path, start_step: int, n_steps: int):
+    """
+    Keras callback capturing a TensorFlow profiler trace of a few
+    training steps of the first epoch. Open it in TensorBoard's
+    Profile tab to see whether input or compute dominates a step.
+
+    :param trace_dir: directory the trace is written to.
+    :param start_step: first traced training step, skips warm-up.
+    :param n_steps: number of traced steps.
+    :return: keras Callback.
+    """
+    import tensorflow as tf
+
+    class ProfilerTraceCallback(tf.keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.tracing = False
+            self.done = False
+
+        def on_train_batch_begin(self, batch, logs=None):
+            if not self.done and not self.tracing and batch == start_step:
+                logger.info(f"Capturing profiler trace of {n_steps} steps to {trace_dir}.")
+                tf.profiler.experimental.start(str(trace_dir))
+                self.tracing = True
+
+        def on_train_batch_end(self, batch, logs=None):
+            if self.tracing and batch >= start_step + n_steps - 1:
+                self.stop()
+
+        def on_epoch_end(self, epoch, logs=None):
+            # Epochs shorter than the traced range end the trace early.
+            if self.tracing:
+                self.stop()
+            self.done = True
+
+        def stop(self):
+            tf.profiler.experimental.stop()
+            self.tracing = False
+            self.done = True
+            logger.info(f"Profiler trace written to {trace_dir}.")
+
+    return ProfilerTraceCallback()
+
+
+def get_throughput_callback(batch_size: int):
+    """
+    Keras callback logging the training throughput and peak RSS of
+    every epoch as train_images_per_s and train_peak_rss_mb, to the
+    active MLflow run and the profile records.
+
+    :param batch_size: images per (micro-)batch.
+    :return: keras Callback.
+    """
+    import mlflow
+    import tensorflow as tf
+
+    class ThroughputCallback(tf.keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.frame = None
+            self.train_start = None
+            self.train_end = None
+            self.n_batches = 0
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self.frame = get_profiler().start("train epoch")
+            self.train_start = time.perf_counter()
+            self.n_batches = 0
+
+        def on_train_batch_end(self, batch, logs=None):
+            self.n_batches += 1
+            self.train_end = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            record = get_profiler().stop(self.frame)
+            # Validation is excluded from the throughput, not from the peak.
+            metrics = {
+                "train_images_per_s": self.n_batches * batch_size / (self.train_end - self.train_start),
+                "train_peak_rss_mb": record["peak_rss_mb"]
+            }
+            logger.info(f"Epoch {epoch}: {metrics['train_images_per_s']:.1f} img/s, "
+                        f"peak rss {metrics['train_peak_rss_mb']:.0f}MB.")
+            if mlflow.active_run() is not None:
+                mlflow.log_metrics(metrics, step=epoch)
+
+    return ThroughputCallback()
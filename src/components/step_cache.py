@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from src import logger
+from src.components.artifact_context import ArtifactContext
+from src.utils.utils import get_file_hash, get_directory_fingerprint
+
+
+@dataclass(frozen=True)
+class StepInputs:
+    name: str
+    cache_dir: Path
+    config: dict = field(default_factory=dict)
+    params: dict = field(default_factory=dict)
+    artifacts: list = field(default_factory=list)
+    outputs: list = field(default_factory=list)
+
+
+# Content hashes of files by (path, size, mtime_ns), so an unchanged
+# file such as a large source archive is hashed at most once.
+_file_hashes = {}
+
+
+def get_artifact_fingerprint(path) -> str:
+    """
+    Fingerprints an upstream artifact: content hash for
+    files, path/size/mtime listing for directories.
+    File hashes are reused while size and mtime are unchanged.
+
+    :param path: file or directory path.
+    :return: fingerprint string.
+    """
+    path = Path(path)
+    if path.is_file():
+        stat = path.stat()
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in _file_hashes:
+            _file_hashes[key] = get_file_hash(path)
+        return _file_hashes[key]
+    elif path.is_dir():
+        return get_directory_fingerprint(path)
+    return "missing"
+
+
+class StepCache:
+    """
+    Skips pipeline steps whose declared inputs are unchanged
+    since their outputs were last produced.
+
+    Outputs the artifact context writes in background are not hashed
+    by later steps: they are identified by a token of the run of the
+    step that produced them, recorded with its fingerprint, so nobody
+    waits for the write to land.
+    """
+
+    def __init__(self, force: list = None, context: ArtifactContext = None):
+        """
+        :param force: names (or parts of names, e.g. "training") of steps
+                      to always run, an empty list forces every step.
+        :param context: artifact context persisting step outputs in background.
+        """
+        self.force = force
+        self.context = context
+        self.output_tokens = {}
+
+
+    @staticmethod
+    def get_record_path(inputs: StepInputs) -> Path:
+        slug = inputs.name.lower().replace(" ", "_")
+        return Path(inputs.cache_dir) / f".{slug}.fingerprint.json"
+
+
+    @staticmethod
+    def load_record(inputs: StepInputs) -> dict:
+        """
+        Fingerprint record of the last completed run, None if there is none.
+        Seeds the file hash cache with the hashes it recorded.
+        """
+        record_path = StepCache.get_record_path(inputs)
+        if not record_path.exists():
+            return None
+        with open(record_path) as f:
+            record = json.load(f)
+        for path, (size, mtime_ns, digest) in record.get("file_hashes", {}).items():
+            _file_hashes.setdefault((path, size, mtime_ns), digest)
+        return record
+
+
+    @staticmethod
+    def get_file_hashes(inputs: StepInputs) -> dict:
+        """
+        Hash cache entries of the step's file artifacts, stored with its record.
+        """
+        paths = {os.path.abspath(path) for path in inputs.artifacts}
+        return {path: [size, mtime_ns, digest]
+                for (path, size, mtime_ns), digest in _file_hashes.items() if path in paths}
+
+
+    def get_artifact_fingerprint(self, path) -> str:
+        """
+        Output token of the step run that wrote the artifact
+        through the context, else a fingerprint of the artifact.
+        """
+        return self.output_tokens.get(os.path.abspath(path)) or get_artifact_fingerprint(path)
+
+
+    def get_output_tokens(self, inputs: StepInputs, fingerprint: str) -> dict:
+        """
+        Tokens of the step's outputs written through the context. They
+        change with every run of the step, also a forced one.
+        """
+        if self.context is None:
+            return {}
+        persisted_paths = self.context.get_persisted_paths()
+        return {os.path.abspath(path): f"{fingerprint}:{time.time_ns()}"
+                for path in inputs.outputs if os.path.abspath(path) in persisted_paths}
+
+
+    def get_components(self, inputs: StepInputs) -> dict:
+        return {
+            "config": {key: json.dumps(value, sort_keys=True, default=str) for key, value in inputs.config.items()},
+            "params": {key: json.dumps(value, sort_keys=True, default=str) for key, value in inputs.params.items()},
+            "artifacts": {str(path): self.get_artifact_fingerprint(path) for path in inputs.artifacts}
+        }
+
+
+    @staticmethod
+    def get_fingerprint(components: dict) -> str:
+        return hashlib.sha256(json.dumps(components, sort_keys=True).encode()).hexdigest()
+
+
+    def is_forced(self, inputs: StepInputs) -> bool:
+        if self.force is None:
+            return False
+        return not self.force or any(name.lower() in inputs.name.lower() for name in self.force)
+
+
+    def get_run_reason(self, inputs: StepInputs, components: dict) -> str:
+        """
+        Explains why a step has to run, None if it can be skipped.
+        """
+        if self.is_forced(inputs):
+            return "forced"
+
+        missing = [str(path) for path in inputs.outputs if not os.path.exists(path)]
+        if missing:
+            return f"missing outputs {missing}"
+
+        record = self.load_record(inputs)
+        if record is None:
+            return "no previous fingerprint"
+
+        changed = []
+        for group, values in components.items():
+            previous = record["components"].get(group, {})
+            changed += [f"{group}.{key}" for key in sorted(set(values) | set(previous))
+                        if values.get(key) != previous.get(key)]
+        if changed:
+            return f"changed inputs {changed}"
+        return None
+
+
+    @staticmethod
+    def write_record(record_path: Path, record: dict):
+        os.makedirs(record_path.parent, exist_ok=True)
+        with open(record_path, "w") as f:
+            json.dump(record, f, indent=2)
+
+
+    def run(self, step: Callable, inputs: StepInputs, **kwargs):
+        """
+        Runs a step unless its inputs are unchanged and records
+        the fingerprint once it completes and the background
+        writes of its outputs succeeded.
+
+        :param step: step function.
+        :param inputs: inputs declared by the step.
+        :param kwargs: arguments passed to the step.
+        :return: step result, None when skipped.
+        """
+        record = self.load_record(inputs)
+        components = self.get_components(inputs)
+        reason = self.get_run_reason(inputs, components)
+        if reason is None:
+            logger.info(f">>> {inputs.name} skipped: inputs unchanged.")
+            self.output_tokens.update(record.get("output_tokens", {}))
+            return None
+
+        logger.info(f">>> {inputs.name} running: {reason}.")
+        # A run that dies before its outputs land must not leave the old record looking current.
+        record_path = self.get_record_path(inputs)
+        if record_path.exists():
+            os.remove(record_path)
+        result = step(**kwargs)
+
+        # Artifacts such as downloaded archives may only exist once the step ran.
+        components = self.get_components(inputs)
+        fingerprint = self.get_fingerprint(components)
+        output_tokens = self.get_output_tokens(inputs, fingerprint)
+        self.output_tokens.update(output_tokens)
+        record = {"fingerprint": fingerprint, "components": components,
+                  "file_hashes": self.get_file_hashes(inputs), "output_tokens": output_tokens}
+        if self.context is not None:
+            self.context.on_persisted(inputs.outputs, lambda: self.write_record(record_path, record))
+        else:
+            self.write_record(record_path, record)
+        return result
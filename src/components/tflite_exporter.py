@@ -0,0 +1,203 @@
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import tensorflow as tf
+
+from src import logger
+from src.config.config_manager import TFLiteExportConfig
+from src.components.artifact_context import ArtifactContext
+from src.components.data_loader import iterate_batches
+from src.components.data_preprocessor import DataPreprocessor
+from src.components.inference_backend import TFLiteModel
+from src.components.profiler import profile
+
+
+class Quantization(ABC):
+    """
+    Abstract class for TFLite post-training quantization schemes.
+    """
+
+    @abstractmethod
+    def configure(self, converter: tf.lite.TFLiteConverter, representative_dataset: Callable):
+        """
+        Sets the converter options of the scheme.
+
+        :param converter: TFLite converter of the trained model.
+        :param representative_dataset: generator of calibration inputs.
+        """
+        pass
+
+
+class DynamicRangeQuantization(Quantization):
+    """
+    int8 weights, float activations quantized on the fly.
+    """
+
+    def configure(self, converter: tf.lite.TFLiteConverter, representative_dataset: Callable):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+
+class Float16Quantization(Quantization):
+    """
+    float16 weights, dequantized to float32 at load.
+    """
+
+    def configure(self, converter: tf.lite.TFLiteConverter, representative_dataset: Callable):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+
+
+class Int8Quantization(Quantization):
+    """
+    int8 weights and activations calibrated on representative data.
+    Ops without an int8 kernel, e.g. the Rescaling and Resizing layers
+    of EMBED_PREPROCESSING, fall back to float builtins.
+    """
+
+    def configure(self, converter: tf.lite.TFLiteConverter, representative_dataset: Callable):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+                                               tf.lite.OpsSet.TFLITE_BUILTINS]
+
+
+class QuantizationFactory:
+    @staticmethod
+    def get_quantization(quantization: str) -> Quantization:
+        """
+        Provides the quantization scheme for a name.
+        """
+        if quantization == "dynamic":
+            return DynamicRangeQuantization()
+        elif quantization == "float16":
+            return Float16Quantization()
+        elif quantization == "int8":
+            return Int8Quantization()
+        else:
+            raise ValueError(f"Quantization {quantization} is not supported.")
+
+
+class TFLiteExporter:
+    """
+    Converts the trained model to quantized TFLite variants
+    and measures their size, latency and test accuracy.
+    """
+
+    def __init__(self, config: TFLiteExportConfig, data_preprocessor: DataPreprocessor,
+                 context: ArtifactContext = None):
+        self.config = config
+        self.data_preprocessor = data_preprocessor
+        self.context = context
+
+
+    def get_model(self) -> tf.keras.Model:
+        if self.context is not None and self.context.get("trained_model") is not None:
+            logger.info("Using the trained model handed over in memory.")
+            return self.context.get("trained_model")
+        logger.info(f"Loading model from {self.config.model_path}.")
+        return tf.keras.models.load_model(self.config.model_path)
+
+
+    def get_representative_dataset(self, model: tf.keras.Model) -> Callable:
+        """
+        Calibration inputs drawn from the validation split,
+        in the dtype and scale the model is fed in training.
+        """
+        input_dtype = model.inputs[0].dtype
+        valid_data = self.data_preprocessor.data_loader.load("valid", shuffle=False, augment=False)
+
+        def representative_dataset():
+            n_samples = 0
+            for images, _ in iterate_batches(valid_data):
+                for image in images:
+                    yield [image[np.newaxis].astype(input_dtype)]
+                    n_samples += 1
+                    if n_samples >= self.config.representative_samples:
+                        return
+
+        return representative_dataset
+
+
+    def get_test_images(self) -> tuple:
+        """
+        :return: (uint8 test images, class indices).
+        """
+        test_data = self.data_preprocessor.preprocess_test_data()
+        # Batches are rescaled to [0, 1] unless the model embeds preprocessing.
+        scale = 1 if self.data_preprocessor.config.embed_preprocessing else 255
+        images, labels = [], []
+        for batch_images, batch_labels in iterate_batches(test_data):
+            if batch_images.dtype != np.uint8:
+                batch_images = np.clip(np.round(batch_images * scale), 0, 255).astype(np.uint8)
+            images.append(batch_images)
+            labels.append(np.argmax(batch_labels, axis=1))
+        if not images:
+            return np.empty((0, 0, 0, 3), dtype=np.uint8), np.empty((0,), dtype=np.int64)
+        return np.concatenate(images), np.concatenate(labels)
+
+
+    def convert(self, model: tf.keras.Model, quantization: str, representative_dataset: Callable) -> Path:
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        QuantizationFactory.get_quantization(quantization).configure(converter, representative_dataset)
+        with profile(f"tflite convert {quantization}"):
+            tflite_model = converter.convert()
+
+        path = self.config.root_dir / f"model_{quantization}.tflite"
+        partial_path = path.with_name(f".{path.stem}.partial{path.suffix}")
+        with open(partial_path, "wb") as f:
+            f.write(tflite_model)
+        os.replace(partial_path, path)
+        logger.info(f"Exported {quantization} TFLite model to {path}.")
+        return path
+
+
+    def evaluate(self, path: Path, images: np.ndarray, labels: np.ndarray) -> dict:
+        """
+        Measures accuracy on the test split and single image latency,
+        only the size without test images.
+        """
+        results = {"size_mb": os.path.getsize(path) / 1024 ** 2}
+        if not len(images):
+            logger.info(f"No test images, skipping accuracy and latency of {path}.")
+            return results
+
+        tflite_model = TFLiteModel(model_path=path)
+        predictions = np.concatenate([
+            np.argmax(tflite_model.predict(images[i:i + 1]), axis=1) for i in range(len(images))
+        ])
+
+        latencies = []
+        for i in range(self.config.latency_runs):
+            start = time.perf_counter()
+            tflite_model.predict(images[i % len(images)][np.newaxis])
+            latencies.append(time.perf_counter() - start)
+
+        return {
+            **results,
+            "test_accuracy": float(np.mean(predictions == labels)),
+            "latency_p50_ms": float(np.percentile(latencies, 50) * 1000),
+            "latency_p95_ms": float(np.percentile(latencies, 95) * 1000)
+        }
+
+
+    def export(self) -> dict:
+        """
+        Exports and evaluates every configured quantization.
+
+        :return: {quantization: {size_mb, test_accuracy, latency_p50_ms, latency_p95_ms}}.
+        """
+        model = self.get_model()
+        representative_dataset = self.get_representative_dataset(model)
+        images, labels = self.get_test_images()
+
+        results = {}
+        for quantization in self.config.quantizations:
+            path = self.convert(model=model, quantization=quantization,
+                                representative_dataset=representative_dataset)
+            results[quantization] = self.evaluate(path=path, images=images, labels=labels)
+            logger.info(f"TFLite {quantization}: {results[quantization]}.")
+        return results
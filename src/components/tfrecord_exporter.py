@@ -0,0 +1,139 @@
+import json
+import os
+import random
+from pathlib import Path
+
+import tensorflow as tf
+
+from src import logger
+from src.config.config_manager import TFRecordExportConfig
+from src.utils.utils import get_directory_fingerprint, create_directories, list_image_files
+
+
+MANIFEST_FILE_NAME = "manifest.json"
+SPLITS = ("train", "valid", "test")
+
+
+def serialize_example(contents: bytes, label: int) -> bytes:
+    """
+    Serializes an encoded image and its class index.
+    """
+    feature = {
+        "image": tf.train.Feature(bytes_list=tf.train.BytesList(value=[contents])),
+        "label": tf.train.Feature(int64_list=tf.train.Int64List(value=[label]))
+    }
+    return tf.train.Example(features=tf.train.Features(feature=feature)).SerializeToString()
+
+
+def parse_example(serialized: tf.Tensor) -> tuple:
+    """
+    Parses a serialized example back into (encoded image, class index).
+    """
+    example = tf.io.parse_single_example(serialized, {
+        "image": tf.io.FixedLenFeature([], tf.string),
+        "label": tf.io.FixedLenFeature([], tf.int64)
+    })
+    return example["image"], example["label"]
+
+
+def read_manifest(root_dir: Path) -> dict:
+    """
+    Reads the manifest written by TFRecordExporter.
+
+    :param root_dir: directory holding the shards.
+    :return: manifest content.
+    """
+    with open(Path(root_dir) / MANIFEST_FILE_NAME) as f:
+        return json.load(f)
+
+
+class TFRecordExporter:
+    """
+    Converts the extracted split directories into
+    size-balanced TFRecord shards with a manifest.
+    """
+
+    def __init__(self, config: TFRecordExportConfig):
+        self.config = config
+
+
+    def is_up_to_date(self, fingerprint: str) -> bool:
+        manifest_path = self.config.root_dir / MANIFEST_FILE_NAME
+        if not manifest_path.exists():
+            return False
+        manifest = read_manifest(self.config.root_dir)
+        # Manifests written before shard size and seed were recorded are re-exported.
+        return (manifest["fingerprint"] == fingerprint
+                and manifest["compression"] == self.config.compression
+                and manifest.get("shard_size_mb") == self.config.shard_size_mb
+                and manifest.get("seed") == self.config.seed)
+
+
+    @staticmethod
+    def balance_shards(file_paths: list, labels: list, n_shards: int) -> list:
+        """
+        Assigns files to shards so every shard holds roughly
+        the same number of bytes (largest files placed first).
+
+        :return: list of [(file path, label), ...] per shard.
+        """
+        shards = [[] for _ in range(n_shards)]
+        shard_sizes = [0] * n_shards
+        files = sorted(zip(file_paths, labels), key=lambda item: os.path.getsize(item[0]), reverse=True)
+        for file_path, label in files:
+            smallest = shard_sizes.index(min(shard_sizes))
+            shards[smallest].append((file_path, label))
+            shard_sizes[smallest] += os.path.getsize(file_path)
+        return shards
+
+
+    def export_split(self, split: str) -> dict:
+        file_paths, labels, class_names = list_image_files(self.config.training_data / split)
+        total_bytes = sum(os.path.getsize(path) for path in file_paths)
+        n_shards = max(1, -(-total_bytes // (self.config.shard_size_mb * 1024 * 1024)))
+        n_shards = min(n_shards, max(1, len(file_paths)))
+
+        options = tf.io.TFRecordOptions(compression_type=self.config.compression or "")
+        extension = ".tfrecord.gz" if self.config.compression == "GZIP" else ".tfrecord"
+        rng = random.Random(self.config.seed)
+
+        shards = []
+        for shard_index, shard_files in enumerate(self.balance_shards(file_paths, labels, n_shards)):
+            # Mix classes within a shard so sequential reads stay shuffled.
+            rng.shuffle(shard_files)
+            shard_name = f"{split}-{shard_index:05d}-of-{n_shards:05d}{extension}"
+            with tf.io.TFRecordWriter(str(self.config.root_dir / shard_name), options=options) as writer:
+                for file_path, label in shard_files:
+                    with open(file_path, "rb") as f:
+                        writer.write(serialize_example(f.read(), label))
+            shards.append({"file": shard_name, "samples": len(shard_files)})
+
+        logger.info(f"Exported {len(file_paths)} {split} images into {n_shards} shards.")
+        return {"class_names": class_names, "samples": len(file_paths), "shards": shards}
+
+
+    def export(self):
+        """
+        Writes shards for every split unless the manifest
+        already matches the source directories.
+        """
+        fingerprint = ":".join(get_directory_fingerprint(self.config.training_data / split) for split in SPLITS)
+        if self.is_up_to_date(fingerprint):
+            logger.info(f"TFRecord shards in {self.config.root_dir} are up to date.")
+            return
+
+        create_directories([self.config.root_dir])
+        for old_file in self.config.root_dir.glob("*.tfrecord*"):
+            old_file.unlink()
+
+        manifest = {
+            "fingerprint": fingerprint,
+            "compression": self.config.compression,
+            "shard_size_mb": self.config.shard_size_mb,
+            "seed": self.config.seed,
+            "splits": {split: self.export_split(split) for split in SPLITS}
+        }
+        # Manifest is written last and marks the export as complete.
+        with open(self.config.root_dir / MANIFEST_FILE_NAME, "w") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"TFRecord manifest written to {self.config.root_dir}.")
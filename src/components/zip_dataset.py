@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import zipfile
+from pathlib import Path, PurePosixPath
+
+from src import logger
+from src.utils.utils import create_directories, IMAGE_EXTENSIONS
+
+
+SPLITS = ("train", "valid", "test")
+
+
+class ZipFilePool:
+    """
+    Per-thread ZipFile handles over one archive, so parallel
+    readers never share a file position.
+    """
+
+    def __init__(self, zip_path: Path):
+        self.zip_path = zip_path
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+
+
+    def get_handle(self) -> zipfile.ZipFile:
+        handle = getattr(self._local, "handle", None)
+        if handle is None:
+            handle = zipfile.ZipFile(self.zip_path, "r")
+            self._local.handle = handle
+            with self._lock:
+                self._handles.append(handle)
+        return handle
+
+
+    def read(self, member) -> bytes:
+        """
+        Reads one archive member by random access.
+
+        :param member: member name (str or bytes).
+        :return: decompressed member content.
+        """
+        if isinstance(member, bytes):
+            member = member.decode()
+        return self.get_handle().read(member)
+
+
+    def close(self):
+        with self._lock:
+            for handle in self._handles:
+                handle.close()
+            self._handles = []
+        self._local = threading.local()
+
+
+class ZipIndex:
+    """
+    Index of the image members of a dataset archive
+    (offset, size, split, class), built once per archive.
+    """
+
+    def __init__(self, zip_path: Path, index_dir: Path):
+        self.zip_path = Path(zip_path)
+        self.index_dir = Path(index_dir)
+        self._index = None
+
+
+    def get_signature(self) -> dict:
+        stat = os.stat(self.zip_path)
+        return {"path": str(self.zip_path.resolve()), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+
+    def get_index(self) -> dict:
+        """
+        Loads the index, rebuilding it when the archive changed.
+
+        :return: index content.
+        """
+        if self._index is not None:
+            return self._index
+
+        index_path = self.index_dir / f"{self.zip_path.stem}_index.json"
+        signature = self.get_signature()
+        if index_path.exists():
+            with open(index_path) as f:
+                index = json.load(f)
+            if index["signature"] == signature:
+                self._index = index
+                return index
+
+        index = self.build(signature)
+        create_directories([self.index_dir])
+        with open(index_path, "w") as f:
+            json.dump(index, f)
+        self._index = index
+        return index
+
+
+    def build(self, signature: dict) -> dict:
+        logger.info(f"Indexing members of {self.zip_path}.")
+        entries = {split: [] for split in SPLITS}
+        with zipfile.ZipFile(self.zip_path, "r") as zip_file:
+            for info in zip_file.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                parts = PurePosixPath(info.filename).parts
+                if "__MACOSX" in parts:
+                    continue
+                # Layout is .../<split>/<class>/.../<image>
+                split_positions = [i for i, part in enumerate(parts[:-2]) if part in SPLITS]
+                if not split_positions:
+                    continue
+                position = split_positions[-1]
+                entries[parts[position]].append({
+                    "name": info.filename,
+                    "offset": info.header_offset,
+                    "size": info.file_size,
+                    "compress_size": info.compress_size,
+                    "class": parts[position + 1]
+                })
+
+        for split in SPLITS:
+            entries[split].sort(key=lambda entry: (entry["class"], entry["name"]))
+            logger.info(f"Indexed {len(entries[split])} {split} images.")
+        return {"signature": signature, "splits": entries}
+
+
+    def get_split(self, split: str) -> tuple:
+        """
+        Lists the members of a split with classes indexed in
+        alphanumeric order like flow_from_directory.
+
+        :param split: name of the split (train, valid, test).
+        :return: (member names, class indices, class names).
+        """
+        entries = self.get_index()["splits"][split]
+        class_names = sorted({entry["class"] for entry in entries})
+        class_indices = {class_name: i for i, class_name in enumerate(class_names)}
+        names = [entry["name"] for entry in entries]
+        labels = [class_indices[entry["class"]] for entry in entries]
+        return names, labels, class_names
@@ -2,8 +2,12 @@ import os
 from pathlib import Path
 
 from src.config.config_manager import DataIngestionConfig, BaseModelConfig, ModelTrainingConfig, DataPreprocessingConfig, \
-    ModelEvaluationConfig, MLFlowConfig
+    ModelEvaluationConfig, MLFlowConfig, ModelInferenceConfig, ModelServingConfig, \
+    FeatureCacheConfig, TFRecordExportConfig, HyperparameterSweepConfig, ProfilingConfig, \
+    InferenceBenchmarkConfig, TrainingBenchmarkConfig, TFLiteExportConfig, DistributedTrainingConfig, \
+    CheckpointConfig
 from src.constants.constants import CONFIG_FILE_PATH, PARAM_FILE_PATH
+from src import logger
 from src.utils.utils import read_yaml, create_directories
 
 
@@ -25,12 +29,47 @@ class ConfigManager:
             source=config["data_config"]["source"],
             sourceURL=config["data_config"]["sourceURL"],
             username=config["data_config"]["username"],
-            extract_to=config["data_config"]["extract_to"]
+            extract_to=config["data_config"]["extract_to"],
+            extract=self.params["DATA_BACKEND"] != "zip"
         )
 
         return data_ingestion_config
 
 
+    def get_tfrecord_export_config(self) -> TFRecordExportConfig:
+        config = self.config["tfrecord_export"]
+        training_data_dir = os.path.join(self.config["data_ingestion"]["data_config"]["extract_to"], "Data")
+
+        create_directories([config["root_dir"]])
+
+        tfrecord_export_config = TFRecordExportConfig(
+            root_dir=Path(config["root_dir"]),
+            training_data=Path(training_data_dir),
+            shard_size_mb=config["shard_size_mb"],
+            compression=config["compression"],
+            seed=self.params["SEED"]
+        )
+
+        return tfrecord_export_config
+
+
+    def get_source_zip_path(self) -> Path:
+        """
+        Location of the dataset archive for the configured source.
+        """
+        data_config = self.config["data_ingestion"]["data_config"]
+        source = data_config["source"]
+
+        if source == "local":
+            return Path(data_config["sourceURL"])
+        elif source == "gdrive":
+            return Path(data_config["extract_to"]) / "downloaded_data.zip"
+        elif source == "kaggle":
+            return Path(data_config["extract_to"]) / f"{data_config['sourceURL'].split('/')[-1]}.zip"
+        else:
+            raise ValueError(f"No archive location known for the specified source: {source}.")
+
+
     def get_basemodel_config(self) -> BaseModelConfig:
         config = self.config["base_model"]
 
@@ -47,7 +86,13 @@ class ConfigManager:
             weights=self.params["WEIGHTS"],
             classes=self.params["CLASSES"],
             optimizer=self.params["OPTIMIZER"],
-            loss_function=self.params["LOSS_FUNCTION"]
+            loss_function=self.params["LOSS_FUNCTION"],
+            embed_preprocessing=self.params["EMBED_PREPROCESSING"],
+            head_type=self.params["HEAD_TYPE"],
+            head_dense_units=self.params["HEAD_DENSE_UNITS"],
+            head_dropout=self.params["HEAD_DROPOUT"],
+            resize_schedule=self.params["RESIZE_SCHEDULE"],
+            gradient_accumulation_steps=self.params["GRADIENT_ACCUMULATION_STEPS"]
         )
 
         return base_model_config
@@ -61,7 +106,17 @@ class ConfigManager:
             training_data=Path(training_data_dir),
             batch_size=model_params["BATCH_SIZE"],
             is_augmentation=model_params["AUGMENTATION"],
-            img_size=model_params["IMAGE_SIZE"]
+            img_size=model_params["IMAGE_SIZE"],
+            data_backend=model_params["DATA_BACKEND"],
+            deterministic=model_params["DETERMINISTIC"],
+            seed=model_params["SEED"],
+            image_cache_dir=Path(self.config["image_cache"]["root_dir"]),
+            tfrecord_dir=Path(self.config["tfrecord_export"]["root_dir"]),
+            source_zip=self.get_source_zip_path(),
+            zip_index_dir=Path(self.config["zip_dataset"]["index_dir"]),
+            embed_preprocessing=model_params["EMBED_PREPROCESSING"],
+            num_shards=1,
+            shard_index=0
         )
 
         return model_training_config
@@ -83,7 +138,8 @@ class ConfigManager:
             n_epochs=model_params["EPOCHS"],
             batch_size=model_params["BATCH_SIZE"],
             is_augmentation=model_params["AUGMENTATION"],
-            img_size=model_params["IMAGE_SIZE"]
+            img_size=model_params["IMAGE_SIZE"],
+            resize_schedule=model_params["RESIZE_SCHEDULE"]
         )
 
         return model_training_config
@@ -104,6 +160,180 @@ class ConfigManager:
         return model_evaluation_config
 
 
+    def get_feature_cache_config(self) -> FeatureCacheConfig:
+        cache_config = self.config["feature_cache"]
+        model_params = self.params
+        training_data_dir = os.path.join(self.config["data_ingestion"]["data_config"]["extract_to"], "Data")
+
+        # Cached features are only valid when every epoch sees the same images.
+        enabled = model_params["CACHE_FEATURES"] and not model_params["AUGMENTATION"]
+        if model_params["CACHE_FEATURES"] and not enabled:
+            logger.info("CACHE_FEATURES is ignored while AUGMENTATION is enabled.")
+
+        feature_cache_config = FeatureCacheConfig(
+            root_dir=Path(cache_config["root_dir"]),
+            training_data=Path(training_data_dir),
+            model_type=model_params["MODEL_TYPE"],
+            img_size=model_params["IMAGE_SIZE"],
+            enabled=enabled,
+            source_zip=self.get_source_zip_path()
+        )
+
+        return feature_cache_config
+
+
+    def get_hyperparameter_sweep_config(self) -> HyperparameterSweepConfig:
+        sweep_config = self.config["hyperparameter_sweep"]
+
+        create_directories([sweep_config["root_dir"]])
+
+        hyperparameter_sweep_config = HyperparameterSweepConfig(
+            root_dir=Path(sweep_config["root_dir"]),
+            search=sweep_config["search"],
+            n_trials=sweep_config["n_trials"],
+            max_workers=sweep_config["max_workers"],
+            metric=sweep_config["metric"],
+            space=sweep_config["space"],
+            seed=self.params["SEED"],
+            adaptive=sweep_config["adaptive"],
+            eta=sweep_config["eta"],
+            min_epochs=sweep_config["min_epochs"],
+            max_epochs=sweep_config["max_epochs"],
+            min_data_fraction=sweep_config["min_data_fraction"],
+            rung_metric=sweep_config["rung_metric"]
+        )
+
+        return hyperparameter_sweep_config
+
+
+    def get_tflite_export_config(self) -> TFLiteExportConfig:
+        export_config = self.config["tflite_export"]
+
+        create_directories([export_config["root_dir"]])
+
+        return TFLiteExportConfig(
+            root_dir=Path(export_config["root_dir"]),
+            model_path=Path(self.config["model_training"]["trained_model_path"]),
+            quantizations=export_config["quantizations"],
+            representative_samples=export_config["representative_samples"],
+            latency_runs=export_config["latency_runs"]
+        )
+
+
+    def get_model_inference_config(self) -> ModelInferenceConfig:
+        inference_config = self.config["model_inference"]
+
+        model_inference_config = ModelInferenceConfig(
+            backend=inference_config["backend"],
+            model_path=Path(inference_config["model_path"]),
+            tflite_model_path=Path(inference_config["tflite_model_path"]),
+            img_size=self.params["IMAGE_SIZE"],
+            reload_interval=inference_config["reload_interval"],
+            batch_size=inference_config["batch_size"],
+            decode_workers=inference_config["decode_workers"],
+            batch_buckets=inference_config["batch_buckets"],
+            jit_compile=inference_config["jit_compile"]
+        )
+
+        return model_inference_config
+
+
+    def get_model_serving_config(self) -> ModelServingConfig:
+        serving_config = self.config["model_serving"]
+
+        model_serving_config = ModelServingConfig(
+            host=serving_config["host"],
+            port=serving_config["port"],
+            max_batch_size=serving_config["max_batch_size"],
+            max_wait_ms=serving_config["max_wait_ms"],
+            workers=serving_config["workers"],
+            max_queue_size=serving_config["max_queue_size"],
+            max_body_mb=serving_config["max_body_mb"],
+            server_url=serving_config["server_url"]
+        )
+
+        return model_serving_config
+
+
+    def get_inference_benchmark_config(self) -> InferenceBenchmarkConfig:
+        benchmark_config = self.config["inference_benchmark"]
+
+        create_directories([benchmark_config["root_dir"]])
+
+        return InferenceBenchmarkConfig(
+            root_dir=Path(benchmark_config["root_dir"]),
+            model_types=benchmark_config["model_types"],
+            img_size=self.params["IMAGE_SIZE"],
+            source_size=benchmark_config["source_size"],
+            n_images=benchmark_config["n_images"],
+            latency_runs=benchmark_config["latency_runs"],
+            throughput_images=benchmark_config["throughput_images"],
+            batch_sizes=benchmark_config["batch_sizes"],
+            threads=benchmark_config["threads"],
+            backends=benchmark_config["backends"],
+            classes=self.params["CLASSES"],
+            seed=self.params["SEED"]
+        )
+
+
+    def get_training_benchmark_config(self) -> TrainingBenchmarkConfig:
+        benchmark_config = self.config["training_benchmark"]
+
+        create_directories([benchmark_config["root_dir"]])
+
+        return TrainingBenchmarkConfig(
+            root_dir=Path(benchmark_config["root_dir"]),
+            model_types=benchmark_config["model_types"],
+            data_backends=benchmark_config["data_backends"],
+            batch_sizes=benchmark_config["batch_sizes"],
+            augmentation=benchmark_config["augmentation"],
+            img_size=self.params["IMAGE_SIZE"],
+            source_size=benchmark_config["source_size"],
+            images_per_class=benchmark_config["images_per_class"],
+            n_steps=benchmark_config["n_steps"],
+            warmup_steps=benchmark_config["warmup_steps"],
+            classes=self.params["CLASSES"],
+            seed=self.params["SEED"]
+        )
+
+
+    def get_profiling_config(self) -> ProfilingConfig:
+        profiling_config = self.config["profiling"]
+
+        create_directories([profiling_config["root_dir"]])
+
+        return ProfilingConfig(
+            root_dir=Path(profiling_config["root_dir"]),
+            trace=profiling_config["trace"],
+            trace_start_step=profiling_config["trace_start_step"],
+            trace_steps=profiling_config["trace_steps"]
+        )
+
+
+    def get_checkpoint_config(self) -> CheckpointConfig:
+        checkpoint_config = self.config["checkpointing"]
+
+        create_directories([checkpoint_config["root_dir"]])
+
+        return CheckpointConfig(
+            root_dir=Path(checkpoint_config["root_dir"]),
+            enabled=checkpoint_config["enabled"],
+            every_n_epochs=checkpoint_config["every_n_epochs"],
+            keep_last=checkpoint_config["keep_last"]
+        )
+
+
+    def get_distributed_training_config(self) -> DistributedTrainingConfig:
+        distributed_config = self.config["distributed_training"]
+
+        return DistributedTrainingConfig(
+            workers=distributed_config["workers"],
+            task_index=distributed_config["task_index"],
+            communication=distributed_config["communication"],
+            base_port=distributed_config["base_port"]
+        )
+
+
     def get_mlflow_config(self) -> MLFlowConfig:
         mlflow_config = self.config["mlflow"]
         return MLFlowConfig(
@@ -8,6 +8,16 @@ class DataIngestionConfig:
     sourceURL: Path
     username: str
     extract_to: Path
+    extract: bool
+
+
+@dataclass(frozen=True)
+class TFRecordExportConfig:
+    root_dir: Path
+    training_data: Path
+    shard_size_mb: int
+    compression: str
+    seed: int
 
 
 @dataclass(frozen=True)
@@ -23,6 +33,12 @@ class BaseModelConfig:
     classes: int
     optimizer: str
     loss_function: str
+    embed_preprocessing: bool
+    head_type: str
+    head_dense_units: int
+    head_dropout: float
+    resize_schedule: list
+    gradient_accumulation_steps: int
 
 
 @dataclass(frozen=True)
@@ -31,6 +47,16 @@ class DataPreprocessingConfig:
     batch_size: int
     is_augmentation: bool
     img_size: list
+    data_backend: str
+    deterministic: bool
+    seed: int
+    image_cache_dir: Path
+    tfrecord_dir: Path
+    source_zip: Path
+    zip_index_dir: Path
+    embed_preprocessing: bool
+    num_shards: int
+    shard_index: int
 
 
 @dataclass(frozen=True)
@@ -43,6 +69,16 @@ class ModelTrainingConfig:
     batch_size: int
     is_augmentation: bool
     img_size: list
+    resize_schedule: list
+
+
+@dataclass(frozen=True)
+class TFLiteExportConfig:
+    root_dir: Path
+    model_path: Path
+    quantizations: list
+    representative_samples: int
+    latency_runs: int
 
 
 @dataclass(frozen=True)
@@ -52,6 +88,114 @@ class ModelEvaluationConfig:
     all_params: dict
 
 
+@dataclass(frozen=True)
+class FeatureCacheConfig:
+    root_dir: Path
+    training_data: Path
+    model_type: str
+    img_size: list
+    enabled: bool
+    source_zip: Path
+
+
+@dataclass(frozen=True)
+class HyperparameterSweepConfig:
+    root_dir: Path
+    search: str
+    n_trials: int
+    max_workers: int
+    metric: str
+    space: dict
+    seed: int
+    adaptive: str
+    eta: int
+    min_epochs: int
+    max_epochs: int
+    min_data_fraction: float
+    rung_metric: str
+
+
+@dataclass(frozen=True)
+class ModelInferenceConfig:
+    backend: str
+    model_path: Path
+    tflite_model_path: Path
+    img_size: list
+    reload_interval: float
+    batch_size: int
+    decode_workers: int
+    batch_buckets: list
+    jit_compile: bool
+
+
+@dataclass(frozen=True)
+class ModelServingConfig:
+    host: str
+    port: int
+    max_batch_size: int
+    max_wait_ms: float
+    workers: int
+    max_queue_size: int
+    max_body_mb: int
+    server_url: str
+
+
+@dataclass(frozen=True)
+class InferenceBenchmarkConfig:
+    root_dir: Path
+    model_types: list
+    img_size: list
+    source_size: list
+    n_images: int
+    latency_runs: int
+    throughput_images: int
+    batch_sizes: list
+    threads: list
+    backends: list
+    classes: int
+    seed: int
+
+
+@dataclass(frozen=True)
+class TrainingBenchmarkConfig:
+    root_dir: Path
+    model_types: list
+    data_backends: list
+    batch_sizes: list
+    augmentation: list
+    img_size: list
+    source_size: list
+    images_per_class: int
+    n_steps: int
+    warmup_steps: int
+    classes: int
+    seed: int
+
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    root_dir: Path
+    trace: bool
+    trace_start_step: int
+    trace_steps: int
+
+
+@dataclass(frozen=True)
+class CheckpointConfig:
+    root_dir: Path
+    enabled: bool
+    every_n_epochs: int
+    keep_last: int
+
+
+@dataclass(frozen=True)
+class DistributedTrainingConfig:
+    workers: list
+    task_index: int
+    communication: str
+    base_port: int
+
+
 @dataclass(frozen=True)
 class MLFlowConfig:
     mlflow_uri: str
@@ -1,9 +1,14 @@
+import hashlib
 import os
 from pathlib import Path
 from src import logger
 import yaml
 
 
+# Same white-list of formats as keras flow_from_directory, restricted to what tf.io can decode.
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+
 def read_yaml(file_path: Path) -> dict:
     """
     Reads in yaml file.
@@ -32,3 +37,58 @@ def create_directories(dirs_path: list):
         os.makedirs(path, exist_ok=True)
         logger.info(f"Directory created at {path}.")
 
+
+
+def get_file_hash(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Computes the sha256 digest of a file.
+
+    :param file_path: path to the file to hash.
+    :param chunk_size: number of bytes read per iteration.
+
+    :return: hex digest of file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_directory_fingerprint(dir_path: Path) -> str:
+    """
+    Computes a cheap fingerprint of a directory tree from
+    relative file paths, sizes and modification times.
+
+    :param dir_path: path to directory.
+
+    :return: hex digest identifying the directory content.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            stat = os.stat(file_path)
+            rel_path = os.path.relpath(file_path, dir_path)
+            digest.update(f"{rel_path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def list_image_files(directory: Path) -> tuple:
+    """
+    Lists images in a <directory>/<class>/<image> layout, with
+    classes indexed in alphanumeric order like flow_from_directory.
+
+    :param directory: split directory.
+    :return: (file paths, class indices, class names).
+    """
+    class_names = sorted(entry.name for entry in os.scandir(directory) if entry.is_dir())
+    file_paths, labels = [], []
+    for class_index, class_name in enumerate(class_names):
+        for root, _, files in sorted(os.walk(os.path.join(directory, class_name))):
+            for file_name in sorted(files):
+                if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                    file_paths.append(os.path.join(root, file_name))
+                    labels.append(class_index)
+    return file_paths, labels, class_names
@@ -1,11 +1,14 @@
 from src import logger
 from src.config.config import ConfigManager
+from src.components.profiler import profile
 from src.components.data_ingestor import DataIngestorFactory
+from src.components.step_cache import StepInputs
 
 
 STAGE_NAME = "Data Ingestion Step"
 
 
+@profile(STAGE_NAME)
 def data_ingestion_step(config: ConfigManager):
     """
     Ingests data based on stored configuration
@@ -19,6 +22,28 @@ def data_ingestion_step(config: ConfigManager):
     logger.info(f">>> {STAGE_NAME} completed.")
 
 
+def get_step_inputs(config: ConfigManager) -> StepInputs:
+    """
+    Declares the inputs and outputs used to decide
+    whether data ingestion can be skipped
+    """
+    data_ingestion_config = config.get_dataingestion_config()
+    data_preprocessing_config = config.get_data_preprocessing_config()
+    artifacts = [data_ingestion_config.sourceURL] if data_ingestion_config.source == "local" else []
+    if data_ingestion_config.extract:
+        outputs = [data_preprocessing_config.training_data]
+    else:
+        outputs = [data_preprocessing_config.source_zip]
+
+    return StepInputs(
+        name=STAGE_NAME,
+        cache_dir=config.config["data_ingestion"]["root_dir"],
+        config={"data_ingestion": config.config["data_ingestion"]},
+        params={key: config.params[key] for key in ["DATA_BACKEND"]},
+        artifacts=artifacts,
+        outputs=outputs
+    )
+
 
 if __name__ == "__main__":
     config = ConfigManager()
@@ -0,0 +1,64 @@
+import dataclasses
+
+import mlflow
+import tensorflow as tf
+
+from src import logger
+from src.config.config import ConfigManager
+from src.components.profiler import profile, get_throughput_callback
+from src.components.base_model import BaseModel, get_model_stats
+from src.components.distribution import SHARDABLE_BACKENDS, get_strategy, get_worker_shard, is_chief
+from src.components.model_trainer import ModelTrainer
+from steps.model_training_step import start_autolog, log_training
+
+STAGE_NAME = "Distributed Model Training Step"
+
+
+@profile(STAGE_NAME)
+def distributed_training_step(config: ConfigManager, strategy: tf.distribute.Strategy):
+    """
+    Builds and compiles the model under the distribution strategy
+    and trains it on this worker's shard of the input data. Only
+    the chief saves models and logs to MLflow.
+    """
+    logger.info(f">>> {STAGE_NAME} started.")
+
+    data_preprocessing_config = config.get_data_preprocessing_config()
+    if data_preprocessing_config.data_backend not in SHARDABLE_BACKENDS:
+        raise ValueError(f"Distributed training needs a DATA_BACKEND of {SHARDABLE_BACKENDS}, "
+                         f"got {data_preprocessing_config.data_backend}.")
+    if config.get_feature_cache_config().enabled:
+        raise ValueError("Distributed training cannot be combined with CACHE_FEATURES.")
+
+    num_shards, shard_index = get_worker_shard(strategy)
+    data_preprocessing_config = dataclasses.replace(data_preprocessing_config,
+                                                    num_shards=num_shards, shard_index=shard_index)
+    logger.info(f"Training on input shard {shard_index} of {num_shards}.")
+
+    base_model = BaseModel(config=config.get_basemodel_config(), strategy=strategy)
+    base_model.get_base_model()
+    base_model.update_base_model()
+
+    model_trainer = ModelTrainer(train_config=config.get_model_training_config(),
+                                 preprocessing_config=data_preprocessing_config,
+                                 strategy=strategy)
+    model_trainer.set_model(base_model.updated_model)
+    model_trainer.preprocess_data()
+
+    chief = is_chief(strategy)
+    if chief:
+        autologged = start_autolog(model_trainer)
+    history = model_trainer.train(callbacks=[get_throughput_callback(batch_size=data_preprocessing_config.batch_size)])
+    if chief:
+        log_training(history, model=model_trainer.get_model(), autologged=autologged)
+        mlflow.log_metrics({f"trained_model_{name}": value
+                            for name, value in get_model_stats(model_trainer.get_model()).items()})
+
+    logger.info(f">>> {STAGE_NAME} completed.")
+
+    return history
+
+
+if __name__ == "__main__":
+    config = ConfigManager()
+    distributed_training_step(config, strategy=get_strategy(config.get_distributed_training_config()))
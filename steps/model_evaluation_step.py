@@ -2,12 +2,15 @@ import mlflow
 
 from src import logger
 from src.config.config import ConfigManager
+from src.components.profiler import profile
+from src.components.artifact_context import ArtifactContext
 from src.components.model_evaluator import ModelEvaluator
 
 STAGE_NAME = "Model Evaluation Step"
 
 
-def model_evaluation_step(config: ConfigManager):
+@profile(STAGE_NAME)
+def model_evaluation_step(config: ConfigManager, context: ArtifactContext = None):
     """
     Evaluates the trained model using ModelEvaluator.
     """
@@ -15,15 +18,21 @@ def model_evaluation_step(config: ConfigManager):
 
     model_evaluation_config = config.get_model_evaluation_config()
     data_preprocessing_config = config.get_data_preprocessing_config()
+    feature_cache_config = config.get_feature_cache_config()
     model_evaluator = ModelEvaluator(eval_config=model_evaluation_config,
-                                     preprocessing_config=data_preprocessing_config)
+                                     preprocessing_config=data_preprocessing_config,
+                                     feature_cache_config=feature_cache_config,
+                                     context=context)
     model_evaluator.process_test_data()
     model_evaluator.evaluate_model()
 
-    mlflow.log_metrics(model_evaluator.get_score())
+    scores = model_evaluator.get_score()
+    mlflow.log_metrics(scores)
 
     logger.info(f">>> {STAGE_NAME} completed.")
 
+    return scores
+
 
 if __name__ == "__main__":
     config = ConfigManager()
@@ -1,22 +1,45 @@
 import numpy as np
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing import image
-import os
 
+from src.config.config import ConfigManager
+from src.components.model_predictor import ModelPredictor, CLASS_LABELS
+from src.components.model_registry import get_model_registry
+
+
+_predictor = None
+
+
+def get_predictor() -> ModelPredictor:
+    """
+    Creates the predictor once per process.
+    """
+    global _predictor
+    if _predictor is None:
+        config = ConfigManager().get_model_inference_config()
+        _predictor = ModelPredictor(config=config, registry=get_model_registry(config))
+    return _predictor
 
 
 def predict(image_file):
-    model = load_model(os.path.join("./model", "model.keras"))
-    test_image = image.load_img(image_file, target_size = (224,224))
-    test_image = image.img_to_array(test_image)
+    predictor = get_predictor()
+    test_image = predictor.load_image(image_file)
     test_image = np.expand_dims(test_image, axis = 0)
-    result = np.argmax(model.predict(test_image), axis=1)
+    result = predictor.predict_arrays(test_image)
     print(result)
 
-    if result[0] == 1:
-        prediction = 'Normal'
-        return [{ "state" : prediction}]
-    else:
-        prediction = 'Adenocarcinoma Cancer'
-        return [{ "state" : prediction}]
+    prediction = CLASS_LABELS.get(int(result[0]), CLASS_LABELS[0])
+    return [{ "state" : prediction}]
+
+
+def predict_batch(paths_or_files, batch_size=None):
+    """
+    Predicts a collection of images in fixed-size batches.
+    """
+    return get_predictor().predict_batch(paths_or_files, batch_size=batch_size)
+
 
+def predict_stream(iterable, batch_size=None):
+    """
+    Lazily predicts images from an iterable,
+    yielding results as each batch finishes.
+    """
+    return get_predictor().predict_stream(iterable, batch_size=batch_size)
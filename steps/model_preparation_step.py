@@ -1,11 +1,19 @@
+import os
+
+import mlflow
+
 from src import logger
 from src.config.config import ConfigManager
-from src.components.base_model import BaseModel
+from src.components.profiler import profile
+from src.components.artifact_context import ArtifactContext
+from src.components.base_model import BaseModel, get_model_stats
+from src.components.step_cache import StepInputs
 
 STAGE_NAME = "Model Initialization Step"
 
 
-def model_initialization_step(config: ConfigManager):
+@profile(STAGE_NAME)
+def model_initialization_step(config: ConfigManager, context: ArtifactContext = None):
     """
     Prepare base model based on saved
     configuration and model params
@@ -13,13 +21,41 @@ def model_initialization_step(config: ConfigManager):
     logger.info(f">>> {STAGE_NAME} started.")
 
     base_model_config = config.get_basemodel_config()
-    base_model = BaseModel(config=base_model_config)
+    base_model = BaseModel(config=base_model_config, context=context)
     base_model.get_base_model()
     base_model.update_base_model()
 
+    mlflow.log_metrics({f"updated_base_model_{name}": value
+                        for name, value in get_model_stats(base_model.updated_model).items()})
+    if context is None:
+        mlflow.log_metric("updated_base_model_size_mb",
+                          os.path.getsize(base_model_config.updated_base_model_path) / 1024 ** 2)
+
     logger.info(f">>> {STAGE_NAME} completed.")
 
 
+STEP_PARAMS = ["MODEL_TYPE", "IMAGE_SIZE", "INCLUDE_TOP", "WEIGHTS", "CLASSES",
+               "LEARNING_RATE", "OPTIMIZER", "LOSS_FUNCTION", "EMBED_PREPROCESSING",
+               "HEAD_TYPE", "HEAD_DENSE_UNITS", "HEAD_DROPOUT", "RESIZE_SCHEDULE",
+               "GRADIENT_ACCUMULATION_STEPS"]
+
+
+def get_step_inputs(config: ConfigManager) -> StepInputs:
+    """
+    Declares the inputs and outputs used to decide
+    whether model initialization can be skipped
+    """
+    base_model_config = config.get_basemodel_config()
+
+    return StepInputs(
+        name=STAGE_NAME,
+        cache_dir=base_model_config.root_dir,
+        config={"base_model": config.config["base_model"]},
+        params={key: config.params[key] for key in STEP_PARAMS},
+        outputs=[base_model_config.base_model_path, base_model_config.updated_base_model_path]
+    )
+
+
 if __name__ == "__main__":
     config = ConfigManager()
     model_initialization_step(config)
\ No newline at end of file
@@ -0,0 +1,38 @@
+import asyncio
+
+from src import logger
+from src.config.config import ConfigManager
+from src.components.inference_server import InferenceServer
+from src.components.model_predictor import ModelPredictor
+from src.components.model_registry import get_model_registry
+
+STAGE_NAME = "Model Serving Step"
+
+
+def model_serving_step(config: ConfigManager):
+    """
+    Serves the trained model over a local HTTP
+    endpoint with dynamic micro-batching.
+    """
+    logger.info(f">>> {STAGE_NAME} started.")
+
+    model_inference_config = config.get_model_inference_config()
+    model_serving_config = config.get_model_serving_config()
+    registry = get_model_registry(model_inference_config)
+    if model_inference_config.backend in ("keras", "compiled"):
+        # Load the keras model before the first request, the tflite backend does not use it.
+        registry.get_model()
+    predictor = ModelPredictor(config=model_inference_config, registry=registry)
+    server = InferenceServer(config=model_serving_config, predictor=predictor)
+
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+    logger.info(f">>> {STAGE_NAME} completed.")
+
+
+if __name__ == "__main__":
+    config = ConfigManager()
+    model_serving_step(config)
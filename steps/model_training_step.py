@@ -1,13 +1,47 @@
+import os
+import time
+
 import mlflow
 
 from src import logger
 from src.config.config import ConfigManager
+from src.components.profiler import profile, get_trace_callback, get_throughput_callback
+from src.components.artifact_context import ArtifactContext
+from src.components.base_model import get_model_stats
+from src.components.checkpoint_manager import CheckpointManager, CheckpointCallback, get_checkpoint_key
 from src.components.model_trainer import ModelTrainer
+from src.components.step_cache import StepInputs
 
 STAGE_NAME = "Model Training Step"
 
 
-def model_training_step(config: ConfigManager):
+def start_autolog(model_trainer: ModelTrainer, initial_epoch: int = 0) -> bool:
+    """
+    Enables mlflow autolog for a single fresh fit. A resumed run or
+    several resize phases call fit with changed params such as
+    initial_epoch, which mlflow rejects, so autolog is disabled then.
+
+    :return: whether autolog is enabled.
+    """
+    autolog = initial_epoch == 0 and model_trainer.get_n_fits(initial_epoch=initial_epoch) == 1
+    mlflow.tensorflow.autolog(log_datasets=False, disable=not autolog)
+    return autolog
+
+
+def log_training(history, model, autologged: bool):
+    """
+    Logs the per-epoch metrics and the model of a training
+    that ran without autolog.
+    """
+    if autologged:
+        return
+    for epoch_index, epoch in enumerate(history.epoch):
+        mlflow.log_metrics({name: values[epoch_index] for name, values in history.history.items()}, step=epoch)
+    mlflow.tensorflow.log_model(model, artifact_path="model")
+
+
+@profile(STAGE_NAME)
+def model_training_step(config: ConfigManager, context: ArtifactContext = None):
     """
     Prepare base model based on saved
     configuration and model params
@@ -16,16 +50,88 @@ def model_training_step(config: ConfigManager):
 
     model_training_config = config.get_model_training_config()
     data_preprocessing_config = config.get_data_preprocessing_config()
+    feature_cache_config = config.get_feature_cache_config()
     model_trainer = ModelTrainer(train_config=model_training_config,
-                                 preprocessing_config=data_preprocessing_config)
-    model_trainer.get_base_model()
+                                 preprocessing_config=data_preprocessing_config,
+                                 feature_cache_config=feature_cache_config,
+                                 context=context)
     model_trainer.preprocess_data()
-    mlflow.tensorflow.autolog(log_datasets=False)
-    history = model_trainer.train()
+    model_trainer.get_base_model()
+
+    callbacks = [get_throughput_callback(batch_size=data_preprocessing_config.batch_size)]
+    mlflow.log_param("effective_batch_size",
+                     data_preprocessing_config.batch_size * config.params["GRADIENT_ACCUMULATION_STEPS"])
+    profiling_config = config.get_profiling_config()
+    if profiling_config.trace:
+        trace_dir = profiling_config.root_dir / time.strftime("trace-%Y%m%d-%H%M%S")
+        callbacks.append(get_trace_callback(trace_dir=trace_dir,
+                                            start_step=profiling_config.trace_start_step,
+                                            n_steps=profiling_config.trace_steps))
+
+    # Head training on cached features is cheap, only full training is checkpointed.
+    checkpoint_manager, initial_epoch = None, 0
+    checkpoint_config = config.get_checkpoint_config()
+    if checkpoint_config.enabled and not feature_cache_config.enabled:
+        checkpoint_manager = CheckpointManager(
+            config=checkpoint_config,
+            key=get_checkpoint_key(config.params, model_training_config.trained_model_path)
+        )
+        checkpoint = checkpoint_manager.get_resume_checkpoint(n_epochs=model_training_config.n_epochs)
+        if checkpoint is not None:
+            checkpoint_manager.restore(model_trainer.get_model(), checkpoint)
+            initial_epoch = checkpoint["epoch"]
+        else:
+            checkpoint_manager.clear()
+        run = mlflow.active_run()
+        callbacks.append(CheckpointCallback(checkpoint_manager=checkpoint_manager,
+                                            every_n_epochs=checkpoint_config.every_n_epochs,
+                                            run_id=run.info.run_id if run is not None else None))
+
+    autologged = start_autolog(model_trainer, initial_epoch=initial_epoch)
+    try:
+        history = model_trainer.train(initial_epoch=initial_epoch, callbacks=callbacks)
+    finally:
+        if checkpoint_manager is not None:
+            checkpoint_manager.close()
+    log_training(history, model=model_trainer.get_model(), autologged=autologged)
+    if profiling_config.trace and trace_dir.exists():
+        mlflow.log_artifacts(str(trace_dir), artifact_path="profiler_trace")
+
+    mlflow.log_metrics({f"trained_model_{name}": value
+                        for name, value in get_model_stats(model_trainer.get_model()).items()})
+    if context is None:
+        mlflow.log_metric("trained_model_size_mb",
+                          os.path.getsize(model_training_config.trained_model_path) / 1024 ** 2)
 
     logger.info(f">>> {STAGE_NAME} completed.")
 
 
+STEP_PARAMS = ["EPOCHS", "BATCH_SIZE", "AUGMENTATION", "IMAGE_SIZE", "DATA_BACKEND",
+               "DETERMINISTIC", "SEED", "CACHE_FEATURES", "EMBED_PREPROCESSING", "RESIZE_SCHEDULE"]
+
+
+def get_step_inputs(config: ConfigManager) -> StepInputs:
+    """
+    Declares the inputs and outputs used to decide
+    whether model training can be skipped
+    """
+    model_training_config = config.get_model_training_config()
+    data_preprocessing_config = config.get_data_preprocessing_config()
+    data_artifact = {
+        "tfrecord": data_preprocessing_config.tfrecord_dir,
+        "zip": data_preprocessing_config.source_zip
+    }.get(data_preprocessing_config.data_backend, data_preprocessing_config.training_data)
+
+    return StepInputs(
+        name=STAGE_NAME,
+        cache_dir=model_training_config.root_dir,
+        config={"model_training": config.config["model_training"]},
+        params={key: config.params[key] for key in STEP_PARAMS},
+        artifacts=[model_training_config.base_model_path, data_artifact],
+        outputs=[model_training_config.trained_model_path]
+    )
+
+
 if __name__ == "__main__":
     config = ConfigManager()
     model_training_step(config)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import os
+
+import mlflow
+
+from src import logger
+from src.config.config import ConfigManager
+from src.components.profiler import profile
+from src.components.artifact_context import ArtifactContext
+from src.components.data_preprocessor import DataPreprocessor
+from src.components.step_cache import StepInputs
+from src.components.tflite_exporter import TFLiteExporter
+
+STAGE_NAME = "TFLite Export Step"
+# Calibration and test inputs depend on these.
+STEP_PARAMS = ["EMBED_PREPROCESSING", "IMAGE_SIZE", "DATA_BACKEND"]
+
+
+@profile(STAGE_NAME)
+def tflite_export_step(config: ConfigManager, context: ArtifactContext = None):
+    """
+    Exports the trained model to quantized TFLite
+    variants and logs their size, latency and accuracy
+    """
+    logger.info(f">>> {STAGE_NAME} started.")
+
+    tflite_export_config = config.get_tflite_export_config()
+    data_preprocessor = context.get("data_preprocessor") if context is not None else None
+    if data_preprocessor is None:
+        data_preprocessor = DataPreprocessor(config=config.get_data_preprocessing_config())
+
+    tflite_exporter = TFLiteExporter(config=tflite_export_config,
+                                     data_preprocessor=data_preprocessor,
+                                     context=context)
+    results = tflite_exporter.export()
+
+    if context is not None:
+        context.wait("trained_model")
+    mlflow.log_metric("keras_size_mb", os.path.getsize(tflite_export_config.model_path) / 1024 ** 2)
+    for quantization, metrics in results.items():
+        mlflow.log_metrics({f"tflite_{quantization}_{name}": value for name, value in metrics.items()})
+    mlflow.log_dict(results, "tflite_export.json")
+
+    logger.info(f">>> {STAGE_NAME} completed.")
+
+    return results
+
+
+def get_step_inputs(config: ConfigManager) -> StepInputs:
+    """
+    Declares the inputs and outputs used to decide
+    whether the TFLite export can be skipped
+    """
+    tflite_export_config = config.get_tflite_export_config()
+    data_preprocessing_config = config.get_data_preprocessing_config()
+    data_artifact = {
+        "tfrecord": data_preprocessing_config.tfrecord_dir,
+        "zip": data_preprocessing_config.source_zip
+    }.get(data_preprocessing_config.data_backend, data_preprocessing_config.training_data)
+
+    return StepInputs(
+        name=STAGE_NAME,
+        cache_dir=tflite_export_config.root_dir,
+        config={"tflite_export": config.config["tflite_export"]},
+        params={key: config.params[key] for key in STEP_PARAMS},
+        artifacts=[tflite_export_config.model_path, data_artifact],
+        outputs=[tflite_export_config.root_dir / f"model_{quantization}.tflite"
+                 for quantization in tflite_export_config.quantizations]
+    )
+
+
+if __name__ == "__main__":
+    config = ConfigManager()
+    tflite_export_step(config)
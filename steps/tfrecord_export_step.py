@@ -0,0 +1,44 @@
+from src import logger
+from src.config.config import ConfigManager
+from src.components.profiler import profile
+from src.components.tfrecord_exporter import TFRecordExporter
+from src.components.step_cache import StepInputs
+
+STAGE_NAME = "TFRecord Export Step"
+
+
+@profile(STAGE_NAME)
+def tfrecord_export_step(config: ConfigManager):
+    """
+    Converts the extracted dataset into
+    sharded TFRecord files with a manifest
+    """
+    logger.info(f">>> {STAGE_NAME} started.")
+
+    tfrecord_export_config = config.get_tfrecord_export_config()
+    tfrecord_exporter = TFRecordExporter(config=tfrecord_export_config)
+    tfrecord_exporter.export()
+
+    logger.info(f">>> {STAGE_NAME} completed.")
+
+
+def get_step_inputs(config: ConfigManager) -> StepInputs:
+    """
+    Declares the inputs and outputs used to decide
+    whether the TFRecord export can be skipped
+    """
+    tfrecord_export_config = config.get_tfrecord_export_config()
+
+    return StepInputs(
+        name=STAGE_NAME,
+        cache_dir=tfrecord_export_config.root_dir,
+        config={"tfrecord_export": config.config["tfrecord_export"]},
+        params={key: config.params[key] for key in ["SEED"]},
+        artifacts=[tfrecord_export_config.training_data],
+        outputs=[tfrecord_export_config.root_dir / "manifest.json"]
+    )
+
+
+if __name__ == "__main__":
+    config = ConfigManager()
+    tfrecord_export_step(config)
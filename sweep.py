@@ -0,0 +1,62 @@
+import argparse
+import dataclasses
+
+import mlflow
+
+from src import logger
+from src.config.config import ConfigManager
+from src.components.adaptive_sweep import HyperparameterSweepFactory
+from src.components.step_cache import StepCache
+from steps import data_ingestion_step
+
+
+EXPERIMENT_NAME = "Chest Cancer Classification"
+
+
+def sweep_pipeline(search: str = None, n_trials: int = None, max_workers: int = None, adaptive: str = None):
+    """
+    Hyperparameter sweep over params.yaml keys, each trial
+    logged as a nested run under one parent mlflow run
+    """
+
+    logger.info("Loading configuration.")
+    config_manager = ConfigManager()
+    sweep_config = config_manager.get_hyperparameter_sweep_config()
+    overrides = {"search": search, "n_trials": n_trials, "max_workers": max_workers, "adaptive": adaptive}
+    sweep_config = dataclasses.replace(sweep_config, **{k: v for k, v in overrides.items() if v is not None})
+
+    mlflow.set_experiment(EXPERIMENT_NAME)
+
+    # Trials share the ingested data, ingest once up front.
+    StepCache().run(data_ingestion_step.data_ingestion_step,
+                    data_ingestion_step.get_step_inputs(config_manager),
+                    config=config_manager)
+
+    run_name = f"sweep-{sweep_config.search}" if sweep_config.adaptive == "none" else f"sweep-{sweep_config.adaptive}"
+    with mlflow.start_run(run_name=run_name):
+        mlflow.set_tag("purpose", "hyperparameter sweep")
+        mlflow.log_params({"search": sweep_config.search, "max_workers": sweep_config.max_workers,
+                           "adaptive": sweep_config.adaptive})
+        if sweep_config.adaptive != "none":
+            mlflow.log_params({"eta": sweep_config.eta, "min_epochs": sweep_config.min_epochs,
+                               "max_epochs": sweep_config.max_epochs,
+                               "min_data_fraction": sweep_config.min_data_fraction})
+        mlflow.log_dict(sweep_config.space, "search_space.json")
+
+        sweep = HyperparameterSweepFactory.get_sweep(config=sweep_config)
+        sweep.run(base_config=config_manager, experiment_name=EXPERIMENT_NAME)
+
+    logger.info(f"Sweep completed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a hyperparameter sweep over params.yaml.")
+    parser.add_argument("--search", choices=["grid", "random"], help="search strategy.")
+    parser.add_argument("--n-trials", type=int, help="number of trials for random search.")
+    parser.add_argument("--max-workers", type=int, help="number of trials run concurrently.")
+    parser.add_argument("--adaptive", choices=["none", "successive_halving", "hyperband"],
+                        help="early termination of weak trials.")
+    args = parser.parse_args()
+
+    sweep_pipeline(search=args.search, n_trials=args.n_trials, max_workers=args.max_workers,
+                   adaptive=args.adaptive)